@@ -1,146 +1,907 @@
 """Board games."""
-from collections import defaultdict
+import bisect
+import bz2
+import gzip
+import io
+import lzma
+import heapq
+import os
+import pickle
+import struct
+from array import array
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, merges fall back to adding the pairs one by one.
+    np = None
+
+BUFFER_SIZE = 1 << 20
+COMPRESSED_MAGICS = ((b'\x1f\x8b', gzip.open), (b'BZh', bz2.open), (b'\xfd7zXZ\x00', lzma.open))
+SNAPSHOT_MAGIC = b'BGSTATS3'
+_SNAPSHOT_HEADER = struct.Struct('<8sQQQI')
+FREQUENT_LEADERS = ("most-frequent-winner", "most-frequent-loser")
+BOARD_LEADERS = ("most-wins", "most-losses", "record-holder")
+BOARD_TOPS = ("top-winners", "top-losers", "top-scorers")
+
+
+def _compression(filename: str):
+    """Return the function that opens the compressed file, or None if the file is not compressed."""
+    with open(filename, 'rb') as file:
+        head = file.read(6)
+    for magic, opener in COMPRESSED_MAGICS:
+        if head.startswith(magic):
+            return opener
+    return None
+
+
+def _file_stamp(filename: str) -> tuple:
+    """Return the size, modification time and inode of the file, which change when it is written or replaced."""
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+def open_input(filename: str, text: bool = True):
+    """Open a plain, gzip, bz2 or xz compressed file for reading, decompressing it on the fly."""
+    opener = _compression(filename)
+    if opener is None:
+        return open(filename, 'r' if text else 'rb', buffering=BUFFER_SIZE)
+    file = io.BufferedReader(opener(filename, 'rb'), buffer_size=BUFFER_SIZE)
+    return io.TextIOWrapper(file) if text else file
+
+
+def _line_ranges(filename: str, shards: int) -> list:
+    """Split the file into at most shards byte ranges that start and end on line boundaries."""
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, 'rb') as file:
+        for shard in range(1, shards):
+            position = size * shard // shards
+            if position <= bounds[-1]:
+                continue
+            file.seek(position - 1)
+            file.readline()
+            position = file.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+
+def _load_shard(shard: tuple):
+    """Load the lines of one byte range of the file into partial statistics, run in a worker process."""
+    filename, start, end = shard
+    partial = Statistics()
+    with open(filename, 'rb') as file:
+        file.seek(start)
+        for line in file:
+            if start >= end:
+                break
+            start += len(line)
+            partial._ingest(line.decode())
+    # Merging only reads the columns, so the per-player and per-game slot indexes are not sent back.
+    partial._player_games = partial._player_slots = partial._game_slots = None
+    return partial
+
+
+def _parse_line(line: str) -> Optional[tuple]:
+    """
+    Split a result line into the game name, players, result type, winner, loser, results of every player and scores.
+
+    Scores are None unless the result type is points.
+    Return None for an empty line, raise ValueError for a malformed one.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    game_name, players, result_type, results = line.split(';')
+    players = players.split(',')
+    scores = None
+    if result_type == "points":
+        scores = list(map(int, results.split(',')))
+        if len(scores) > len(players):
+            raise ValueError(f"More scores than players: {line!r}")
+        winner = players[scores.index(max(scores))]
+        loser = players[scores.index(min(scores))]
+        values = scores + [0] * (len(players) - len(scores))
+    elif result_type == "places":
+        places = results.split(',')
+        winner = places[0]
+        loser = places[-1]
+        positions = {player: place for place, player in enumerate(places, 1)}
+        values = [positions.get(player, 0) for player in players]
+    elif result_type == "winner":
+        winner = results
+        loser = None
+        values = [int(player == winner) for player in players]
+    else:
+        raise ValueError(f"Unknown result type: {line!r}")
+    return game_name, players, result_type, winner, loser, values, scores
+
+
+def _take(table: array, ids: array) -> array:
+    """Return the items of the table at the ids, as an array of the same type as the table."""
+    if np is None or not ids:
+        return array(table.typecode, map(table.__getitem__, ids))
+    return _to_array(table.typecode, np.frombuffer(table, dtype=table.typecode)[np.frombuffer(ids, dtype=ids.typecode)])
+
+
+def _to_array(typecode: str, values) -> array:
+    """Turn a NumPy array into an array of the typecode."""
+    result = array(typecode)
+    result.frombytes(np.ascontiguousarray(values, dtype=typecode).tobytes())
+    return result
+
+
+def _column(values: array):
+    """Return a read-only NumPy view of the array."""
+    return np.frombuffer(values, dtype=values.typecode)
+
+
+class Leaderboard:
+    """
+    Players of one game ranked by a pair column whose values never go down, best first.
+
+    Ties go to the player with the smaller rank. Heap entries are (-value, rank, slot) and every raise of a value
+    pushes a new entry. Entries whose value no longer matches the column are stale, they are skipped when the board
+    is read and dropped when the heap gets too big.
+    """
+
+    def __init__(self, values: array, ranks: array, players: array, slots):
+        self.values = values
+        self.ranks = ranks
+        self.players = players
+        self._heap = [(-values[slot], ranks[slot], slot) for slot in slots]
+        heapq.heapify(self._heap)
+        self._size = len(self._heap)
+
+    def push(self, slot: int, new: bool):
+        """Rank the slot by its current value, new tells whether the slot was not on the board yet."""
+        self._size += new
+        heapq.heappush(self._heap, (-self.values[slot], self.ranks[slot], slot))
+        if len(self._heap) > 2 * self._size + 16:
+            self._heap = [entry for entry in self._heap if self._is_current(entry)]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry: tuple) -> bool:
+        return self.values[entry[2]] == -entry[0]
+
+    def best(self) -> int:
+        """Return the best player, or -1 if the board is empty."""
+        heap = self._heap
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return self.players[heap[0][2]] if heap else -1
+
+    def top(self, n: int) -> list:
+        """Return the n best players, best first, walking only the top of the heap."""
+        heap, result = self._heap, []
+        candidates = [(heap[0], 0)] if heap else []
+        while candidates and len(result) < n:
+            entry, index = heapq.heappop(candidates)
+            if self._is_current(entry):
+                result.append(self.players[entry[2]])
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(candidates, (heap[child], child))
+        return result
 
 
 class Statistics:
-    def __init__(self, filename: str):
-        self.games_list = []
+    def __init__(self, filename: Optional[str] = None, cache_size: int = 1024, workers: int = 1):
+        self.cache_size = cache_size
+        self.version = 0
+        self.filename = filename
+        self._cache = OrderedDict()
+        self._cache_version = 0
+        self._build_routes()
+        self._reset()
+        if filename is not None:
+            self.load_data(filename, workers)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ("_cache", "_boards", "_leaders", "_static_routes", "_player_routes", "_game_routes",
+                     "_game_arg_routes", "_entity_routes"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = OrderedDict()
+        self._cache_version = self.version
+        self._boards = {}
+        self._leaders = {}
+        self._build_routes()
+
+    def save_snapshot(self, path: str):
+        """
+        Save the loaded statistics into a binary snapshot file.
+
+        The snapshot records the size, modification time and inode the source file had when it was last loaded
+        or refreshed, so from_snapshot can tell when the snapshot has gone stale.
+        Only statistics loaded from a file can be saved, otherwise ValueError is raised.
+        """
+        if self.filename is None or self._source_stat is None:
+            raise ValueError("Only statistics loaded from a file can be saved as a snapshot")
+        source = os.path.abspath(self.filename).encode()
+        with open(path + '.tmp', 'wb') as file:
+            file.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, *self._source_stat, len(source)))
+            file.write(source)
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def from_snapshot(cls, path: str, filename: Optional[str] = None, workers: int = 1) -> "Statistics":
+        """
+        Load statistics from a snapshot file made with save_snapshot.
+
+        If the snapshot is missing, unreadable or older than the source file (its size, modification time
+        or inode has changed), the source file is loaded again and a new snapshot is saved in place of the old one.
+        The source file is the one the snapshot was made from, unless filename is given.
+        Snapshots are pickles, so only load snapshots made by yourself.
+        """
+        try:
+            with open(path, 'rb') as file:
+                magic, *stamp, length = _SNAPSHOT_HEADER.unpack(file.read(_SNAPSHOT_HEADER.size))
+                source = file.read(length).decode()
+                filename = filename or source
+                if magic == SNAPSHOT_MAGIC and _file_stamp(filename) == tuple(stamp):
+                    stats = pickle.load(file)
+                    stats.filename = filename
+                    return stats
+        except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError):
+            pass
+        if filename is None:
+            raise FileNotFoundError(f"No usable snapshot at {path} and no source file given")
+        stats = cls(filename, workers=workers)
+        stats.save_snapshot(path)
+        return stats
+
+    def _reset(self):
+        """
+        Forget all loaded data.
+
+        Player, game and result type names are interned to dense integer ids, everything else is kept in arrays.
+        Counters of a player in a game live in "pair" slots, numbered in the order the pairs were first counted.
+        _player_games holds the ids of the games of every player in ascending order, so a slot is found by
+        bisection, and _player_slots the slots of those games. The favourite game of a player is kept as a slot.
+        The first_* columns hold the line (or for scores the log position) where the pair first won, lost or scored,
+        which ranks the ties of the leaderboards. The leaderboards of a game are made from its slots when first read
+        and kept up to date from then on, most-frequent leaders are worked out when first read and dropped when
+        the game changes.
+        The played games themselves are kept as a columnar log, see game_record.
+        """
         self.players = {}
+        self.player_names = []
         self.games = {}
-        self.load_data(filename)
-
-    def load_data(self, filename: str):
-        with open(filename, 'r') as file:
-            for line in file:
-                game_name, players, result_type, results = line.strip().split(';')
-                players = players.split(',')
-                
-                self.games_list.append({
-                    "name": game_name,
-                    "players": players,
-                    "type": result_type,
-                    "results": results
-                })
-
-                for player in players:
-                    if player not in self.players:
-                        self.players[player] = {
-                            "games_played": defaultdict(int),
-                            "wins": defaultdict(int),
-                            "losses": defaultdict(int),
-                            "points": defaultdict(list)
-                        }
-                    self.players[player]["games_played"][game_name] += 1
-
-                if game_name not in self.games:
-                    self.games[game_name] = {
-                        "times_played": 0,
-                        "wins": defaultdict(int),
-                        "losses": defaultdict(int),
-                        "points": defaultdict(list)
-                    }
-                self.games[game_name]["times_played"] += 1
-
-                if result_type == "points":
-                    scores = list(map(int, results.split(',')))
-                    winner = players[scores.index(max(scores))]
-                    loser = players[scores.index(min(scores))]
-                    
-                    for player, score in zip(players, scores):
-                        self.players[player]["points"][game_name].append(score)
-                        self.games[game_name]["points"][player].append(score)
-
-                elif result_type == "places":
-                    places = results.split(',')
-                    winner = places[0]
-                    loser = places[-1]
-
-                elif result_type == "winner":
-                    winner = results
-                    loser = None
-
-                if winner:
-                    self.players[winner]["wins"][game_name] += 1
-                    self.games[game_name]["wins"][winner] += 1
-                if loser:
-                    self.players[loser]["losses"][game_name] += 1
-                    self.games[game_name]["losses"][loser] += 1
+        self.game_names = []
+        self.result_types = {}
+        self.result_type_names = []
+        self.type_counts = defaultdict(int)
+        self.sorted_players = []
+        self.sorted_games = []
 
-    def get(self, path: str):
+        self._player_played = array('I')
+        self._player_wins = array('I')
+        self._player_favourite = array('q')
+        self._player_games = []
+
+        self._game_times = array('I')
+        self._game_max_players = array('I')
+        self._game_slots = []
+        self._boards = {}
+        self._leaders = {}
+
+        self._player_slots = []
+        self._pair_player = array('I')
+        self._pair_game = array('I')
+        self._pair_played = array('I')
+        self._pair_wins = array('I')
+        self._pair_losses = array('I')
+        self._pair_scores = array('I')
+        self._pair_record = array('q')
+        self._pair_first_win = array('I')
+        self._pair_first_loss = array('I')
+        self._pair_first_score = array('Q')
+
+        self._log_game = array('I')
+        self._log_type = array('B')
+        self._log_offsets = array('Q', [0])
+        self._log_players = array('I')
+        self._log_results = array('q')
+
+        self._dirty_games = set()
+        self._offset = 0
+        self._source_stat = None
+        self.skipped_lines = 0
+
+    def _player_id(self, name: str) -> int:
+        """Return the id of the player, adding the player if needed."""
+        player_id = self.players.get(name)
+        if player_id is None:
+            player_id = self.players[name] = len(self.player_names)
+            self.player_names.append(name)
+            self._player_played.append(0)
+            self._player_wins.append(0)
+            self._player_favourite.append(-1)
+            self._player_games.append(array('I'))
+            self._player_slots.append(array('I'))
+        return player_id
+
+    def _game_id(self, name: str) -> int:
+        """Return the id of the game, adding the game if needed."""
+        game_id = self.games.get(name)
+        if game_id is None:
+            game_id = self.games[name] = len(self.game_names)
+            self.game_names.append(name)
+            self._game_times.append(0)
+            self._game_max_players.append(0)
+            self._game_slots.append(array('I'))
+        return game_id
+
+    def _pair(self, player_id: int, game_id: int) -> int:
+        """Return the slot of the counters of the player in the game, adding the slot if needed."""
+        games = self._player_games[player_id]
+        index = bisect.bisect_left(games, game_id)
+        if index < len(games) and games[index] == game_id:
+            return self._player_slots[player_id][index]
+        slot = len(self._pair_played)
+        self._pair_played.append(0)
+        self._pair_wins.append(0)
+        self._pair_losses.append(0)
+        self._pair_scores.append(0)
+        self._pair_record.append(0)
+        self._pair_first_win.append(0)
+        self._pair_first_loss.append(0)
+        self._pair_first_score.append(0)
+        self._pair_player.append(player_id)
+        self._pair_game.append(game_id)
+        self._game_slots[game_id].append(slot)
+        games.insert(index, game_id)
+        self._player_slots[player_id].insert(index, slot)
+        return slot
+
+    def _count_played(self, player_id: int, slot: int, times: int = 1):
+        """Count the player having played the game of the slot times, keeping the favourite game up to date."""
+        played = self._pair_played[slot] = self._pair_played[slot] + times
+        self._player_played[player_id] += times
+        favourite = self._player_favourite[player_id]
+        if favourite < 0 or played > self._pair_played[favourite] or (
+                played == self._pair_played[favourite] and slot < favourite):
+            self._player_favourite[player_id] = slot
+
+    def _count_win(self, player_id: int, slot: int, rank: int, times: int = 1):
+        """Count the player having won the game of the slot times, the first win being at rank."""
+        new = not self._pair_wins[slot]
+        if new:
+            self._pair_first_win[slot] = rank
+        self._pair_wins[slot] += times
+        self._player_wins[player_id] += times
+        self._push(slot, 0, new)
+
+    def _count_loss(self, slot: int, rank: int, times: int = 1):
+        """Count the player having lost the game of the slot times, the first loss being at rank."""
+        new = not self._pair_losses[slot]
+        if new:
+            self._pair_first_loss[slot] = rank
+        self._pair_losses[slot] += times
+        self._push(slot, 1, new)
+
+    def _count_score(self, slot: int, score: int, rank: int, times: int = 1):
+        """Count the score times, keeping the record score of the player in the game up to date."""
+        new = not self._pair_scores[slot]
+        if new:
+            self._pair_first_score[slot] = rank
+        if new or score > self._pair_record[slot]:
+            self._pair_record[slot] = score
+            self._push(slot, 2, new)
+        self._pair_scores[slot] += times
+
+    def _push(self, slot: int, board: int, new: bool):
+        """Rank the slot on the leaderboard of its game for BOARD_LEADERS[board], if the board has been made."""
+        leaderboard = self._boards.get((self._pair_game[slot], board))
+        if leaderboard is not None:
+            leaderboard.push(slot, new)
+
+    def game_record(self, index: int) -> dict:
+        """Return the played game with the index as a dict of its name, players, result type and results."""
+        start, end = self._log_offsets[index], self._log_offsets[index + 1]
+        players = [self.player_names[player_id] for player_id in self._log_players[start:end]]
+        values = self._log_results[start:end]
+        result_type = self.result_type_names[self._log_type[index]]
+        if result_type == "points":
+            results = ",".join(map(str, values))
+        elif result_type == "places":
+            placed = sorted((place, player) for place, player in zip(values, players) if place)
+            results = ",".join(player for _, player in placed)
+        else:
+            results = next((player for value, player in zip(values, players) if value), "")
+        return {
+            "name": self.game_names[self._log_game[index]],
+            "players": players,
+            "type": result_type,
+            "results": results
+        }
+
+    def load_data(self, filename: str, workers: int = 1):
+        """
+        Load the results of the file.
+
+        With more than one worker the file is split into line-aligned byte ranges that are loaded in a process pool
+        and merged in file order, which gives the same statistics as loading the file serially.
+        Compressed files cannot be split and are always loaded serially.
+        """
+        self.filename = filename
+        stamp = _file_stamp(filename)
+        if workers > 1 and _compression(filename) is None:
+            shards = [(filename, start, end) for start, end in _line_ranges(filename, workers * 4)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                self._merge_all(executor.map(_load_shard, shards))
+            self._offset = shards[-1][2] if shards else 0
+        else:
+            offset = 0
+            with open_input(filename, text=False) as file:
+                for line in file:
+                    offset += len(line)
+                    self._ingest(line.decode())
+            self._offset = offset
+        self._source_stat = stamp
+        self._summarize()
+        self.version += 1
+
+    def merge(self, other: "Statistics"):
+        """Add the statistics of other, which come from data after ours."""
+        self._merge_all([other])
+        self._summarize()
+        self.version += 1
+
+    def _merge_all(self, partials):
+        """
+        Add the statistics of the partials without updating the summaries, they come from data after ours in order.
+
+        The names of every partial are interned and its log is remapped as it comes, the pair counters of all
+        partials are then added column by column in one go (one slot at a time without NumPy).
+        """
+        partials = list(partials) if np is not None else partials
+        shifts = []
+        for other in partials:
+            player_ids = array('I', map(self._player_id, other.player_names))
+            game_ids = array('I', map(self._game_id, other.game_names))
+            type_ids = array('B', map(self._type_id, other.result_type_names))
+            for result_type, count in other.type_counts.items():
+                self.type_counts[result_type] += count
+            for other_id, game_id in enumerate(game_ids):
+                self._game_times[game_id] += other._game_times[other_id]
+                self._game_max_players[game_id] = max(self._game_max_players[game_id],
+                                                      other._game_max_players[other_id])
+                self._dirty_games.add(game_id)
+            line_shift, position_shift = len(self._log_game), self._log_offsets[-1]
+            self._log_game.extend(_take(game_ids, other._log_game))
+            self._log_type.extend(_take(type_ids, other._log_type))
+            self._log_offsets.extend(array('Q', [offset + position_shift for offset in other._log_offsets[1:]]))
+            self._log_players.extend(_take(player_ids, other._log_players))
+            self._log_results.extend(other._log_results)
+            if np is None:
+                self._merge_pairs(other, player_ids, game_ids, line_shift, position_shift)
+            else:
+                shifts.append((player_ids, game_ids, line_shift, position_shift))
+        if shifts:
+            self._merge_pair_columns(partials, shifts)
+
+    def _merge_pairs(self, other: "Statistics", player_ids: array, game_ids: array, line_shift: int,
+                     position_shift: int):
+        """Add the pair counters of other one slot at a time, the ids of other mapped to ours."""
+        for other_slot, played in enumerate(other._pair_played):
+            player_id = player_ids[other._pair_player[other_slot]]
+            slot = self._pair(player_id, game_ids[other._pair_game[other_slot]])
+            self._count_played(player_id, slot, played)
+            if other._pair_wins[other_slot]:
+                self._count_win(player_id, slot, other._pair_first_win[other_slot] + line_shift,
+                                other._pair_wins[other_slot])
+            if other._pair_losses[other_slot]:
+                self._count_loss(slot, other._pair_first_loss[other_slot] + line_shift, other._pair_losses[other_slot])
+            if other._pair_scores[other_slot]:
+                self._count_score(slot, other._pair_record[other_slot],
+                                  other._pair_first_score[other_slot] + position_shift, other._pair_scores[other_slot])
+
+    def _merge_pair_columns(self, partials: list, shifts: list):
+        """
+        Add the pair counters of the partials with NumPy, the ids of every partial mapped to ours.
+
+        Our pairs and the pairs of the partials are stacked in order and grouped by (player, game),
+        so a slot keeps its number and new slots are numbered in the order they were first counted.
+        The per-player and per-game slot indexes and the favourite games are then built again,
+        the leaderboards are dropped.
+        """
+        sources = [self] + partials
+        line_shifts = [0] + [line_shift for _, _, line_shift, _ in shifts]
+        position_shifts = [0] + [position_shift for _, _, _, position_shift in shifts]
+        keys = [_column(self._pair_player).astype(np.uint64) << np.uint64(32) | _column(self._pair_game)]
+        for other, (player_ids, game_ids, _, _) in zip(partials, shifts):
+            players = _column(player_ids)[_column(other._pair_player)].astype(np.uint64)
+            keys.append(players << np.uint64(32) | _column(game_ids)[_column(other._pair_game)])
+        keys, first, inverse = np.unique(np.concatenate(keys), return_index=True, return_inverse=True)
+        order = np.argsort(first, kind='stable')
+        slot_of_key = np.empty(len(keys), np.int64)
+        slot_of_key[order] = np.arange(len(keys))
+        row_slots = slot_of_key[inverse.ravel()]
+        keys = keys[order]
+
+        def stacked(name: str, shifted: Optional[list] = None):
+            """Return the column of every source one after the other, each shifted by its shift if given."""
+            if shifted is None:
+                return np.concatenate([_column(getattr(source, name)) for source in sources])
+            return np.concatenate([_column(getattr(source, name)) + shift for source, shift in zip(sources, shifted)])
+
+        def added(name: str):
+            total = np.zeros(len(keys), getattr(self, name).typecode)
+            np.add.at(total, row_slots, stacked(name))
+            return total
+
+        def first_of(count_name: str, name: str, shifted: list):
+            counted = stacked(count_name) > 0
+            never = np.iinfo(getattr(self, name).typecode).max
+            lowest = np.full(len(keys), never, getattr(self, name).typecode)
+            np.minimum.at(lowest, row_slots[counted], stacked(name, shifted)[counted])
+            lowest[lowest == never] = 0
+            return lowest
+
+        counters = ("_pair_played", "_pair_wins", "_pair_losses", "_pair_scores")
+        played, wins, losses, scores = (added(name) for name in counters)
+        first_win = first_of("_pair_wins", "_pair_first_win", line_shifts)
+        first_loss = first_of("_pair_losses", "_pair_first_loss", line_shifts)
+        first_score = first_of("_pair_scores", "_pair_first_score", position_shifts)
+        scored = stacked("_pair_scores") > 0
+        record = np.full(len(keys), np.iinfo(np.int64).min, 'q')
+        np.maximum.at(record, row_slots[scored], stacked("_pair_record")[scored])
+        record[scores == 0] = 0
+        pair_players = (keys >> np.uint64(32)).astype(np.int64)
+        pair_games = (keys & np.uint64(0xFFFFFFFF)).astype(np.int64)
+
+        self._pair_player = _to_array('I', pair_players)
+        self._pair_game = _to_array('I', pair_games)
+        self._pair_played = _to_array('I', played)
+        self._pair_wins = _to_array('I', wins)
+        self._pair_losses = _to_array('I', losses)
+        self._pair_scores = _to_array('I', scores)
+        self._pair_record = _to_array('q', record)
+        self._pair_first_win = _to_array('I', first_win)
+        self._pair_first_loss = _to_array('I', first_loss)
+        self._pair_first_score = _to_array('Q', first_score)
+
+        player_count, game_count = len(self.player_names), len(self.game_names)
+        self._player_played = _to_array('I', np.bincount(pair_players, played, player_count))
+        self._player_wins = _to_array('I', np.bincount(pair_players, wins, player_count))
+        favourite = np.full(player_count, -1, np.int64)
+        counted = np.flatnonzero(played)
+        by_player = counted[np.lexsort((counted, -played[counted].astype(np.int64), pair_players[counted]))]
+        leading = np.ones(len(by_player), bool)
+        leading[1:] = pair_players[by_player[1:]] != pair_players[by_player[:-1]]
+        favourite[pair_players[by_player[leading]]] = by_player[leading]
+        self._player_favourite = _to_array('q', favourite)
+
+        by_player = np.lexsort((pair_games, pair_players))
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(pair_players, minlength=player_count))))
+        sorted_games = pair_games[by_player]
+        self._player_games = [_to_array('I', sorted_games[bounds[i]:bounds[i + 1]]) for i in range(player_count)]
+        self._player_slots = [_to_array('I', by_player[bounds[i]:bounds[i + 1]]) for i in range(player_count)]
+        by_game = np.argsort(pair_games, kind='stable')
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(pair_games, minlength=game_count))))
+        self._game_slots = [_to_array('I', by_game[bounds[i]:bounds[i + 1]]) for i in range(game_count)]
+        # The leaderboards rank the replaced columns, they are made again when read.
+        self._boards.clear()
+
+    def ingest_line(self, line: str) -> bool:
+        """Add one result line to the statistics, return whether it held a result."""
+        return self.ingest_lines([line]) == 1
+
+    def ingest_lines(self, lines) -> int:
+        """
+        Add result lines to the statistics in place, return the amount of results added.
+
+        A malformed line raises ValueError, the lines before it stay added.
+        """
+        added = 0
+        try:
+            for line in lines:
+                added += self._ingest(line)
+        finally:
+            if added:
+                self._summarize()
+                self.version += 1
+        return added
+
+    def can_refresh_in_place(self) -> bool:
+        """
+        Return whether refresh can add the appended lines to the loaded data, instead of loading everything again.
+
+        That is not the case when the file is compressed, has become shorter, has been replaced by another file
+        (its inode has changed) or has gone back in time.
+        """
+        if self._source_stat is None or _compression(self.filename) is not None:
+            return False
+        size, mtime_ns, inode = _file_stamp(self.filename)
+        return inode == self._source_stat[2] and size >= self._offset and mtime_ns >= self._source_stat[1]
+
+    def refresh(self) -> int:
+        """
+        Add the lines appended to the loaded file since the last load or refresh.
+
+        Only complete lines are read, a line that is still being written is left for the next refresh.
+        Malformed lines are skipped and counted in skipped_lines.
+        If the file has become shorter, has been replaced or is compressed, everything is loaded again,
+        see can_refresh_in_place.
+        Return the amount of results added.
+        """
+        stamp = _file_stamp(self.filename)
+        if not self.can_refresh_in_place():
+            self._reset()
+            self.load_data(self.filename)
+            return len(self._log_game)
+        added = 0
+        try:
+            with open_input(self.filename, text=False) as file:
+                file.seek(self._offset)
+                for line in file:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        added += self._ingest(line.decode())
+                    except ValueError:
+                        self.skipped_lines += 1
+                    self._offset += len(line)
+            self._source_stat = stamp
+        finally:
+            if added:
+                self._summarize()
+                self.version += 1
+        return added
+
+    def _type_id(self, name: str) -> int:
+        """Return the id of the result type, adding the type if needed."""
+        type_id = self.result_types.get(name)
+        if type_id is None:
+            type_id = self.result_types[name] = len(self.result_type_names)
+            self.result_type_names.append(name)
+        return type_id
+
+    def _ingest(self, line: str) -> bool:
+        """
+        Add one result line without updating the summaries, return whether it held a result.
+
+        The line is checked before anything is counted, so a malformed line raises ValueError and changes nothing.
+        """
+        parsed = _parse_line(line)
+        if parsed is None:
+            return False
+        game_name, players, result_type, winner, loser, values, scores = parsed
+        for name in (winner, loser):
+            if name and name not in players and name not in self.players:
+                raise ValueError(f"Unknown player {name!r} in {line.strip()!r}")
+        game_id = self._game_id(game_name)
+        player_ids = [self._player_id(player) for player in players]
+        slots = [self._pair(player_id, game_id) for player_id in player_ids]
+
+        for player_id, slot in zip(player_ids, slots):
+            self._count_played(player_id, slot)
+        self._game_times[game_id] += 1
+        self._game_max_players[game_id] = max(self._game_max_players[game_id], len(players))
+        self._dirty_games.add(game_id)
+
+        if scores is not None:
+            position = len(self._log_players)
+            for rank, (slot, score) in enumerate(zip(slots, scores), position):
+                self._count_score(slot, score, rank)
+
+        line_index = len(self._log_game)
+        if winner:
+            self._count_win(self.players[winner], self._slot_of(winner, game_id, players, slots), line_index)
+        if loser:
+            self._count_loss(self._slot_of(loser, game_id, players, slots), line_index)
+
+        self.type_counts[result_type] += 1
+        self._log_game.append(game_id)
+        self._log_type.append(self._type_id(result_type))
+        self._log_players.extend(player_ids)
+        self._log_results.extend(values)
+        self._log_offsets.append(len(self._log_players))
+        return True
+
+    def _slot_of(self, name: str, game_id: int, players: list, slots: list) -> int:
+        """Return the pair slot of the named player in the game, reusing the slots of the players of the line."""
+        if name in players:
+            return slots[players.index(name)]
+        return self._pair(self.players[name], game_id)
+
+    def _summarize(self):
+        """
+        Add the new names to the sorted names and drop the leaders of the games that changed since the last time.
+
+        The cost depends on what changed, not on the amount of data loaded before.
+        """
+        self._add_sorted(self.sorted_players, self.player_names)
+        self._add_sorted(self.sorted_games, self.game_names)
+        for game_id in self._dirty_games:
+            for leader in range(len(FREQUENT_LEADERS)):
+                self._leaders.pop((game_id, leader), None)
+        self._dirty_games.clear()
+
+    @staticmethod
+    def _add_sorted(sorted_names: list, names: list):
+        """Add the names that were added to names since the last time to sorted_names, keeping it sorted."""
+        added = names[len(sorted_names):]
+        if len(added) > 64:
+            sorted_names.extend(added)
+            sorted_names.sort()
+        else:
+            for name in added:
+                bisect.insort(sorted_names, name)
+
+    def _most_frequent(self, game_id: int, leader: int) -> Optional[str]:
+        """
+        Return the name of the player that wins (or loses for FREQUENT_LEADERS[1]) the game most often per game played.
+
+        Ties go to the player that won (or lost) first. The answer is kept until the game changes.
+        """
+        if (game_id, leader) in self._leaders:
+            return self._leaders[game_id, leader]
+        counts, ranks = ((self._pair_wins, self._pair_first_win), (self._pair_losses, self._pair_first_loss))[leader]
+        best, best_key = -1, None
+        for slot in self._game_slots[game_id]:
+            if counts[slot]:
+                key = (counts[slot] / self._pair_played[slot], -ranks[slot])
+                if best < 0 or key > best_key:
+                    best, best_key = slot, key
+        name = self._leaders[game_id, leader] = None if best < 0 else self.player_names[self._pair_player[best]]
+        return name
+
+    def _board(self, game_id: int, board: int) -> Leaderboard:
+        """
+        Return the leaderboard of the game for BOARD_LEADERS[board].
+
+        A board is made from the pair slots of the game when it is first read, from then on _count_win,
+        _count_loss and _count_score push every change to it.
+        """
+        leaderboard = self._boards.get((game_id, board))
+        if leaderboard is None:
+            values, ranks, counts = ((self._pair_wins, self._pair_first_win, self._pair_wins),
+                                     (self._pair_losses, self._pair_first_loss, self._pair_losses),
+                                     (self._pair_record, self._pair_first_score, self._pair_scores))[board]
+            slots = [slot for slot in self._game_slots[game_id] if counts[slot]]
+            leaderboard = self._boards[game_id, board] = Leaderboard(values, ranks, self._pair_player, slots)
+        return leaderboard
+
+    def _build_routes(self):
+        """
+        Bind every route to its handler once, so a request is answered with dict lookups.
+
+        Handlers take a list of items (player or game ids for the player and game routes)
+        and return a list of results, so that many paths of the same route can be answered in one go.
+        """
+        self._static_routes = {
+            "/players": lambda: list(self.sorted_players),
+            "/games": lambda: list(self.sorted_games),
+            "/total": lambda: len(self._log_game)
+        }
+        self._player_routes = {
+            "amount": lambda ids: [self._player_played[i] for i in ids],
+            "favourite": lambda ids: [self.game_names[self._pair_game[self._player_favourite[i]]] for i in ids],
+            "won": lambda ids: [self._player_wins[i] for i in ids]
+        }
+        self._game_routes = {
+            "amount": lambda ids: [self._game_times[i] for i in ids],
+            "player-amount": lambda ids: [self._game_max_players[i] for i in ids]
+        }
+        for leader, name in enumerate(FREQUENT_LEADERS):
+            self._game_routes[name] = lambda ids, leader=leader: [self._most_frequent(i, leader) for i in ids]
+        for board, leader in enumerate(BOARD_LEADERS):
+            self._game_routes[leader] = lambda ids, board=board: [self._best_of(self._board(i, board)) for i in ids]
+        self._game_arg_routes = {
+            top: lambda items, board=board: [[self.player_names[player_id] for player_id
+                                              in self._board(i, board).top(n)] for i, n in items]
+            for board, top in enumerate(BOARD_TOPS)
+        }
+        self._entity_routes = {
+            "player": (self._player_routes, "players", "Player not found"),
+            "game": (self._game_routes, "games", "Game not found")
+        }
+
+    def _best_of(self, board: Leaderboard) -> Optional[str]:
+        """Return the name of the best player of the board, or None if the board is empty."""
+        player_id = board.best()
+        return None if player_id < 0 else self.player_names[player_id]
+
+    def _static_batch(self, paths: list) -> list:
+        """Answer paths that have a route of their own."""
+        return [self._static_routes[path]() for path in paths]
+
+    def _total_batch(self, result_types: list) -> list:
+        """Answer /total/<type> paths."""
+        return [self.type_counts.get(result_type, 0) for result_type in result_types]
+
+    @staticmethod
+    def _constant_batch(results: list) -> list:
+        """Answer paths whose answer is already known, like "Unknown path"."""
+        return results
+
+    def _resolve(self, path: str) -> tuple:
+        """Return the batch handler of the path and the item to give it."""
+        if path in self._static_routes:
+            return self._static_batch, path
         parts = path.split('/')
+        if path.startswith("/total/"):
+            return self._total_batch, parts[-1]
+        if len(parts) >= 3 and not parts[0]:
+            if parts[1] in self._entity_routes:
+                routes, collection, not_found = self._entity_routes[parts[1]]
+                entity_id = getattr(self, collection).get(parts[2])
+                if entity_id is None:
+                    return self._constant_batch, not_found
+                handler = routes.get(parts[3]) if len(parts) == 4 else None
+                if handler is not None:
+                    return handler, entity_id
+                if parts[1] == "game" and len(parts) == 5 and parts[3] in self._game_arg_routes and parts[4].isdigit():
+                    return self._game_arg_routes[parts[3]], (entity_id, int(parts[4]))
+        return self._constant_batch, "Unknown path"
+
+    def _dispatch(self, path: str):
+        """Find the handler of the path and call it."""
+        handler, item = self._resolve(path)
+        return handler([item])[0]
+
+    def _sync_cache(self):
+        """Drop the cached results if the data has changed since they were cached."""
+        if self._cache_version != self.version:
+            self._cache.clear()
+            self._cache_version = self.version
+
+    def _remember(self, path: str, result):
+        """Cache the result of the path, dropping the least recently used result if the cache is full."""
+        self._cache[path] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get(self, path: str):
+        self._sync_cache()
+        if path in self._cache:
+            self._cache.move_to_end(path)
+            result = self._cache[path]
+        else:
+            result = self._dispatch(path)
+            self._remember(path, result)
+        return list(result) if isinstance(result, list) else result
+
+    def get_many(self, paths) -> list:
+        """
+        Answer many paths at once, in the order they were given.
+
+        Every distinct path is parsed once, and the paths of the same route are answered together
+        with one call of its handler. Each path gets the same answer get would give it.
+        """
+        self._sync_cache()
+        paths = list(paths)
+        results = {}
+        groups = {}
+        for path in paths:
+            if path in results:
+                continue
+            if path in self._cache:
+                results[path] = self._cache[path]
+                continue
+            handler, item = self._resolve(path)
+            group = groups.setdefault(handler, ([], []))
+            group[0].append(path)
+            group[1].append(item)
+            results[path] = None
+        for handler, (group_paths, items) in groups.items():
+            for path, result in zip(group_paths, handler(items)):
+                results[path] = result
+                self._remember(path, result)
+        return [list(results[path]) if isinstance(results[path], list) else results[path] for path in paths]
 
-        if path == "/players":
-            return sorted(list(self.players.keys()))
-        elif path == "/games":
-            return sorted(list(self.games.keys()))
-        elif path == "/total":
-            return len(self.games_list)
-        elif path.startswith("/total/"):
-            result_type = parts[-1]
-            return len([game for game in self.games_list if game["type"] == result_type])
-
-        elif parts[1] == "player":
-            player_name = parts[2]
-            if player_name not in self.players:
-                return "Player not found"
-
-            if parts[3] == "amount":
-                return sum(self.players[player_name]["games_played"].values())
-            elif parts[3] == "favourite":
-                games = self.players[player_name]["games_played"]
-                if not games:
-                    return None
-                return max(games.items(), key=lambda x: x[1])[0]
-            elif parts[3] == "won":
-                return sum(self.players[player_name]["wins"].values())
-
-        elif parts[1] == "game":
-            game_name = parts[2]
-            if game_name not in self.games:
-                return "Game not found"
-
-            if parts[3] == "amount":
-                return self.games[game_name]["times_played"]
-            elif parts[3] == "player-amount":
-                player_counts = [len(game["players"]) for game in self.games_list 
-                               if game["name"] == game_name]
-                return max(player_counts)
-            elif parts[3] == "most-wins":
-                wins = self.games[game_name]["wins"]
-                if not wins:
-                    return None
-                return max(wins.items(), key=lambda x: x[1])[0]
-            elif parts[3] == "most-frequent-winner":
-                wins = self.games[game_name]["wins"]
-                if not wins:
-                    return None
-                win_rates = {}
-                for player in wins.keys():
-                    games_played = self.players[player]["games_played"][game_name]
-                    win_rates[player] = wins[player] / games_played
-                return max(win_rates.items(), key=lambda x: x[1])[0]
-            elif parts[3] == "most-losses":
-                losses = self.games[game_name]["losses"]
-                if not losses:
-                    return None
-                return max(losses.items(), key=lambda x: x[1])[0]
-            elif parts[3] == "most-frequent-loser":
-                losses = self.games[game_name]["losses"]
-                if not losses:
-                    return None
-                loss_rates = {}
-                for player in losses.keys():
-                    games_played = self.players[player]["games_played"][game_name]
-                    loss_rates[player] = losses[player] / games_played
-                return max(loss_rates.items(), key=lambda x: x[1])[0]
-            elif parts[3] == "record-holder":
-                points = self.games[game_name]["points"]
-                if not points:
-                    return None
-                max_points = {player: max(scores) for player, scores in points.items()}
-                return max(max_points.items(), key=lambda x: x[1])[0]
-
-        return "Unknown path"
 
 if __name__ == "__main__":
     stats = Statistics("data.txt")
@@ -0,0 +1,234 @@
+"""Asyncio HTTP server in front of board game statistics."""
+import argparse
+import asyncio
+import bisect
+import json
+import logging
+import os
+import time
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+from board_games import Statistics
+
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+MAX_HEADER_LINES = 100
+ERROR_ROUTES = {"Unknown path": "unknown", "Player not found": "/player/*", "Game not found": "/game/*"}
+
+logger = logging.getLogger(__name__)
+
+
+def route_of(path: str) -> str:
+    """
+    Return the route of the path, with player, game and result type names and arguments replaced by "*".
+
+    Paths that are not answered get one route per error, see ERROR_ROUTES, so junk paths cannot add routes.
+    """
+    parts = path.split('/')
+    if len(parts) >= 3 and parts[1] == "total":
+        return "/total/*"
+    if len(parts) >= 3 and parts[1] in ("player", "game"):
+        parts[2] = "*"
+        if len(parts) > 4:
+            parts[4:] = ["*"]
+    return '/'.join(parts)
+
+
+class RouteMetrics:
+    """Request count, total latency and latency histogram of one route."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        """Count one request that took the given time."""
+        self.count += 1
+        self.total_seconds += seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def as_dict(self) -> dict:
+        """Return the metrics as a JSON friendly dict."""
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["+inf"]
+        return {
+            "count": self.count,
+            "mean_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "histogram": dict(zip(bounds, self.buckets))
+        }
+
+
+class StatsServer:
+    """
+    HTTP server answering Statistics.get paths, like GET /game/7%20wonders/most-wins, as JSON.
+
+    All clients share one loaded Statistics. When its data file changes, the statistics are refreshed.
+    GET /metrics returns per-route latency histograms and throughput counters.
+    A path that fails to be answered gets a 500 response, the error is logged and counted in the metrics.
+    """
+
+    def __init__(self, stats: Statistics, host: str = "127.0.0.1", port: int = 0, reload_interval: float = 1.0):
+        self.stats = stats
+        self.host = host
+        self.port = port
+        self.reload_interval = reload_interval
+        self.routes = {}
+        self.requests = 0
+        self.errors = 0
+        self.reloads = 0
+        self.started = time.monotonic()
+        self._server = None
+        self._watcher = None
+        self._file_key = self._current_file_key()
+
+    def _current_file_key(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.stats.filename)
+        except (OSError, TypeError):
+            return None
+        return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+    async def start(self):
+        """Start listening and watching the data file. With port 0 a free port is picked and stored in port."""
+        self.started = time.monotonic()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.reload_interval:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def serve_forever(self):
+        """Serve requests until cancelled."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop watching the data file and close the server."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def reload(self) -> bool:
+        """
+        Refresh the statistics if the data file has changed, return whether it had.
+
+        Appended lines are added in place on the event loop, so requests wait while they are read,
+        which takes time in proportion to the appended lines only, not to the data loaded before.
+        When the file has to be loaded again from the start, a new Statistics is loaded in a worker thread
+        and swapped in once it is ready, the old one keeps answering requests meanwhile.
+        """
+        key = self._current_file_key()
+        if key is None or key == self._file_key:
+            return False
+        if self.stats.can_refresh_in_place():
+            self.stats.refresh()
+        else:
+            old = self.stats
+            stats = await asyncio.get_running_loop().run_in_executor(None, Statistics, old.filename, old.cache_size)
+            stats.version = old.version + 1
+            self.stats = stats
+        self._file_key = key
+        self.reloads += 1
+        return True
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception("Reloading %s failed", self.stats.filename)
+
+    def metrics(self) -> dict:
+        """Return the throughput counters and per-route latency histograms."""
+        uptime = time.monotonic() - self.started
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "requests_per_second": self.requests / uptime if uptime > 0 else 0.0,
+            "uptime_seconds": uptime,
+            "reloads": self.reloads,
+            "data_version": self.stats.version,
+            "routes": {route: metrics.as_dict() for route, metrics in sorted(self.routes.items())}
+        }
+
+    def answer(self, path: str):
+        """Answer one path and record how long it took, return the HTTP status and the result."""
+        if path == "/metrics":
+            return 200, self.metrics()
+        start = time.perf_counter()
+        self.requests += 1
+        try:
+            result = self.stats.get(path)
+        except Exception:
+            logger.exception("Answering %s failed", path)
+            self.errors += 1
+            return 500, {"error": "Internal server error"}
+        route = ERROR_ROUTES.get(result, route_of(path)) if isinstance(result, str) else route_of(path)
+        self.routes.setdefault(route, RouteMetrics()).observe(time.perf_counter() - start)
+        return (404 if result == "Unknown path" else 200), result
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Bad request"}, False)
+                    break
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if method != "GET":
+                    status, body = 405, {"error": "Only GET is supported"}
+                else:
+                    status, body = self.answer(unquote(urlsplit(target).path))
+                await self._respond(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body, keep_alive: bool):
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                   500: "Internal Server Error"}
+        data = json.dumps(body).encode()
+        writer.write((f"HTTP/1.1 {status} {reasons[status]}\r\n"
+                      f"Content-Type: application/json\r\n"
+                      f"Content-Length: {len(data)}\r\n"
+                      f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + data)
+        await writer.drain()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve board game statistics over HTTP.")
+    parser.add_argument("filename", nargs="?", default="data.txt")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--reload-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = StatsServer(Statistics(args.filename), args.host, args.port, args.reload_interval)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,76 @@
+"""Localhost tests of the statistics server."""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from board_games import Statistics
+from stats_server import StatsServer
+
+RESULTS = [
+    "chess;ann,bob;winner;ann\n",
+    "7 wonders;ann,bob,cid;points;30,45,12\n",
+    "catan;bob,cid;places;cid,bob\n",
+]
+
+
+class StatsServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "data.txt")
+        with open(self.filename, "w") as file:
+            file.writelines(RESULTS)
+        self.server = StatsServer(Statistics(self.filename), port=0, reload_interval=0.02)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.directory.cleanup()
+
+    async def fetch(self, path: str) -> tuple:
+        """Send one GET request to the server, return the status and the decoded JSON body."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(body)
+
+    async def test_route(self):
+        self.assertEqual(await self.fetch("/players"), (200, ["ann", "bob", "cid"]))
+        self.assertEqual(await self.fetch("/game/7%20wonders/most-wins"), (200, "bob"))
+
+    async def test_unknown_path(self):
+        self.assertEqual(await self.fetch("/nothing/here"), (404, "Unknown path"))
+
+    async def test_concurrent_clients(self):
+        answers = await asyncio.gather(*(self.fetch("/total") for _ in range(20)))
+        self.assertEqual(answers, [(200, 3)] * 20)
+
+    async def test_metrics(self):
+        await self.fetch("/players")
+        await self.fetch("/player/ann/amount")
+        await self.fetch("/junk/1")
+        await self.fetch("/junk/2")
+        status, metrics = await self.fetch("/metrics")
+        self.assertEqual(status, 200)
+        self.assertEqual(metrics["requests"], 4)
+        self.assertEqual(sorted(metrics["routes"]), ["/player/*/amount", "/players", "unknown"])
+        self.assertEqual(metrics["routes"]["unknown"]["count"], 2)
+
+    async def test_reload_on_append(self):
+        with open(self.filename, "a") as file:
+            file.write("chess;bob,cid;winner;bob\n")
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if (await self.fetch("/total"))[1] == 4:
+                break
+        self.assertEqual(await self.fetch("/total"), (200, 4))
+        self.assertEqual(await self.fetch("/player/bob/won"), (200, 2))
+        self.assertEqual((await self.fetch("/metrics"))[1]["reloads"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,35 @@
 """Awesome bank exercise."""
+import bz2
+import gzip
+import heapq
+import io
+import lzma
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the array module is used without it.
+    np = None
+
+CHUNK_SIZE = 1 << 20
+BUFFER_SIZE = 1 << 20
+COMPRESSED_MAGICS = ((b'\x1f\x8b', gzip.open), (b'BZh', bz2.open), (b'\xfd7zXZ\x00', lzma.open))
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'BIDX'
+INDEX_VERSION = 1
+BINARY_MAGIC = b'CLNT'
+BINARY_VERSION = 2
+_BINARY_HEADER = struct.Struct('<4sHHQQQ')
+_INDEX_HEADER = struct.Struct('<4sHHQQI')
+_INDEX_ENTRY = struct.Struct('<QQI')
+
 
 class Client:
     """
@@ -49,34 +78,1095 @@ class Client:
         return 0
 
 
-def read_from_file_into_list(filename: str) -> list:
+def _compression(filename: str):
     """
-    Read from the file, make client objects and add the clients into a list.
+    Find out how the file is compressed by looking at its first bytes.
+
+    :param filename: name of the file.
+    :return: function that opens the file (gzip.open, bz2.open or lzma.open), or None if the file is not compressed.
+    """
+    with open(filename, 'rb') as file:
+        head = file.read(6)
+    for magic, opener in COMPRESSED_MAGICS:
+        if head.startswith(magic):
+            return opener
+    return None
+
+
+def open_input(filename: str, text: bool = True):
+    """
+    Open a plain, gzip, bz2 or xz compressed file for reading.
+
+    Compressed files are decompressed while they are read, no temporary files are made.
+
+    :param filename: name of the file.
+    :param text: open the file in text mode instead of binary mode.
+    :return: file object.
+    """
+    opener = _compression(filename)
+    if opener is None:
+        file = open(filename, 'rb', buffering=BUFFER_SIZE)
+    else:
+        file = io.BufferedReader(opener(filename, 'rb'), buffer_size=BUFFER_SIZE)
+    return io.TextIOWrapper(file) if text else file
+
+
+def _parse_client(line: str) -> Client:
+    """
+    Make a client object out of one line of the file.
+
+    :param line: "name,bank,account_age,starting_amount,current_amount"
+    :return: client.
+    """
+    name, bank, account_age, starting_amount, current_amount = line.strip().split(',')
+    return Client(name, bank, int(account_age), int(starting_amount), int(current_amount))
+
+
+def _parse_clients(filename: str) -> list:
+    """
+    Parse every line of the file into a client.
 
     :param filename: name of file to get info from.
     :return: list of clients.
     """
-    clients = []
-    with open(filename, 'r') as file:
+    with open_input(filename) as file:
+        return [_parse_client(line) for line in file]
+
+
+def iter_clients(filename: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Read the clients from the file one by one.
+
+    The file is read in big chunks and only one chunk is held in memory at a time,
+    so files bigger than the memory can be gone through.
+
+    :param filename: name of file to get info from.
+    :param chunk_size: amount of bytes to read at a time.
+    :return: generator of clients.
+    """
+    with open_input(filename, text=False) as file:
+        rest = b''
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            lines = (rest + chunk).split(b'\n')
+            rest = lines.pop()
+            for line in lines:
+                if line:
+                    yield _parse_client(line.decode())
+        if rest:
+            yield _parse_client(rest.decode())
+
+
+def _largest_earner(clients) -> Optional[Client]:
+    """
+    Find the client with the largest positive earnings per day.
+
+    Ties go to the client with the younger account, then to the one that came first.
+
+    :param clients: clients to look through.
+    :return: client with largest earnings or None.
+    """
+    max_earnings = None
+    max_value = 0
+    for client in clients:
+        value = client.earnings_per_day()
+        if value > 0 and (max_earnings is None or value > max_value or (
+                value == max_value and client.account_age < max_earnings.account_age)):
+            max_earnings = client
+            max_value = value
+    return max_earnings
+
+
+def _largest_loser(clients) -> Optional[Client]:
+    """
+    Find the client with the largest loss per day.
+
+    Ties go to the client with the younger account, then to the one that came first.
+
+    :param clients: clients to look through.
+    :return: client with largest loss or None.
+    """
+    max_loss = None
+    max_value = 0
+    for client in clients:
+        value = client.earnings_per_day()
+        if value < 0 and (max_loss is None or value < max_value or (
+                value == max_value and client.account_age < max_loss.account_age)):
+            max_loss = client
+            max_value = value
+    return max_loss
+
+
+def _int_column(values):
+    """
+    Turn the values into a typed integer column.
+
+    :param values: integers, an array or a memoryview of them.
+    :return: NumPy int64 array if NumPy is installed, otherwise an array('q') (or the memoryview as it is).
+    """
+    if np is not None:
+        return np.asarray(values, dtype=np.int64)
+    if isinstance(values, (array, memoryview)):
+        return values
+    return array('q', values)
+
+
+def _extremes(clients) -> tuple:
+    """
+    Find both the largest earner and the largest loser in one pass.
+
+    The same rules as in _largest_earner and _largest_loser apply.
+
+    :param clients: clients to look through.
+    :return: client with largest earnings and client with largest loss (either can be None).
+    """
+    max_earnings = max_loss = None
+    max_value = min_value = 0
+    for client in clients:
+        value = client.earnings_per_day()
+        if value > 0:
+            if max_earnings is None or value > max_value or (
+                    value == max_value and client.account_age < max_earnings.account_age):
+                max_earnings = client
+                max_value = value
+        elif value < 0:
+            if max_loss is None or value < min_value or (
+                    value == min_value and client.account_age < max_loss.account_age):
+                max_loss = client
+                min_value = value
+    return max_earnings, max_loss
+
+
+class ClientLedger:
+    """
+    Clients stored column by column.
+
+    Names and banks are kept in lists, the account age and the amounts of money in typed arrays
+    (NumPy arrays when NumPy is installed, the array module otherwise).
+    That way the earnings of every client can be calculated at once instead of client by client.
+    """
+
+    def __init__(self, names: list, banks: list, account_ages, starting_amounts, current_amounts):
+        """
+        ClientLedger constructor.
+
+        :param names: names of the clients
+        :param banks: banks of the clients
+        :param account_ages: ages of the accounts in days
+        :param starting_amounts: amounts of money the clients started with
+        :param current_amounts: current amounts of money
+        """
+        self.names = names
+        self.banks = banks
+        self.account_ages = _int_column(account_ages)
+        self.starting_amounts = _int_column(starting_amounts)
+        self.current_amounts = _int_column(current_amounts)
+        self._earnings = None
+
+    @classmethod
+    def from_clients(cls, clients) -> 'ClientLedger':
+        """
+        Make a ledger out of client objects.
+
+        :param clients: clients to store.
+        :return: ledger.
+        """
+        names, banks = [], []
+        account_ages, starting_amounts, current_amounts = array('q'), array('q'), array('q')
+        for client in clients:
+            names.append(client.name)
+            banks.append(client.bank)
+            account_ages.append(client.account_age)
+            starting_amounts.append(client.starting_amount)
+            current_amounts.append(client.current_amount)
+        return cls(names, banks, account_ages, starting_amounts, current_amounts)
+
+    @classmethod
+    def from_file(cls, filename: str) -> 'ClientLedger':
+        """
+        Read a ledger straight from the file without making client objects.
+
+        :param filename: name of file to get info from.
+        :return: ledger.
+        """
+        names, banks = [], []
+        account_ages, starting_amounts, current_amounts = array('q'), array('q'), array('q')
+        with open_input(filename) as file:
+            for line in file:
+                name, bank, account_age, starting_amount, current_amount = line.strip().split(',')
+                names.append(name)
+                banks.append(bank)
+                account_ages.append(int(account_age))
+                starting_amounts.append(int(starting_amount))
+                current_amounts.append(int(current_amount))
+        return cls(names, banks, account_ages, starting_amounts, current_amounts)
+
+    def __len__(self):
+        """
+        Ledger length.
+
+        :return: amount of clients.
+        """
+        return len(self.names)
+
+    def client(self, index: int) -> Client:
+        """
+        Make a client object out of one row.
+
+        :param index: row number.
+        :return: client.
+        """
+        return Client(self.names[index], self.banks[index], int(self.account_ages[index]),
+                      int(self.starting_amounts[index]), int(self.current_amounts[index]))
+
+    def earnings_per_day(self):
+        """
+        Earnings per day of every client, calculated in one pass.
+
+        Clients whose account is not older than 0 days have earned 0 per day, like in Client.earnings_per_day.
+
+        :return: array of earnings, one per client.
+        """
+        if self._earnings is None:
+            if np is not None:
+                ages = self.account_ages
+                earnings = np.zeros(len(ages), dtype=np.float64)
+                np.divide(self.current_amounts - self.starting_amounts, ages, out=earnings, where=ages > 0)
+            else:
+                earnings = array('d', [
+                    (current - starting) / age if age > 0 else 0
+                    for age, starting, current in zip(self.account_ages, self.starting_amounts, self.current_amounts)
+                ])
+            self._earnings = earnings
+        return self._earnings
+
+    def top_k_earners(self, k: int) -> list:
+        """
+        Find the k clients that have earned the most money per day.
+
+        Only clients that have earned money are counted.
+        If two people have earned the same amount of money per day, the one that has earned it in less time comes first.
+
+        :param k: amount of clients to return.
+        :return: clients, the largest earner first.
+        """
+        return [self.client(index) for index in self._top_k(k, -1)]
+
+    def top_k_losers(self, k: int) -> list:
+        """
+        Find the k clients that have lost the most money per day.
+
+        Only clients that have lost money are counted.
+        If two people have lost the same amount of money per day, the one that has lost it in less time comes first.
+
+        :param k: amount of clients to return.
+        :return: clients, the largest loser first.
+        """
+        return [self.client(index) for index in self._top_k(k, 1)]
+
+    def _top_k(self, k: int, sign: int) -> list:
+        """
+        Find the rows of the k extreme clients.
+
+        Rows are ordered by sign * earnings, then by account age, then by row number.
+
+        :param k: amount of rows to return.
+        :param sign: -1 for the largest earners, 1 for the largest losers.
+        :return: row numbers.
+        """
+        if k <= 0:
+            return []
+        earnings = self.earnings_per_day()
+        if np is not None:
+            rows = np.flatnonzero(earnings * sign < 0)
+            keys = earnings[rows] * sign
+            if k < len(rows):
+                kth = np.partition(keys, k - 1)[k - 1]
+                rows = rows[keys <= kth]
+                keys = earnings[rows] * sign
+            order = np.lexsort((rows, self.account_ages[rows], keys))
+            return [int(row) for row in rows[order[:k]]]
+        ages = self.account_ages
+        rows = [row for row, value in enumerate(earnings) if value * sign < 0]
+        return heapq.nsmallest(k, rows, key=lambda row: (earnings[row] * sign, ages[row], row))
+
+
+def _padding(size: int) -> int:
+    """
+    Get the amount of bytes needed after a block to align the next one to 8 bytes.
+
+    :param size: size of the block.
+    :return: amount of padding bytes.
+    """
+    return -size % 8
+
+
+def write_binary_ledger(filename: str, binary_filename: str) -> int:
+    """
+    Convert a text client file into the binary ledger format.
+
+    The binary file has a header, the account ages and the amounts of money as 8 byte integer columns,
+    the name and bank of every row as 4 byte ids into a table of distinct names and a table of distinct banks,
+    and the two string tables themselves (offsets, then the encoded strings).
+    Every block starts on an 8 byte boundary so the columns can be used straight from a memory map.
+
+    :param filename: name of the text file.
+    :param binary_filename: name of the binary file to write.
+    :return: amount of clients written.
+    """
+    names, banks = {}, {}
+    name_ids, bank_ids = array('I'), array('I')
+    account_ages, starting_amounts, current_amounts = array('q'), array('q'), array('q')
+    for client in iter_clients(filename):
+        name_ids.append(names.setdefault(client.name, len(names)))
+        bank_ids.append(banks.setdefault(client.bank, len(banks)))
+        account_ages.append(client.account_age)
+        starting_amounts.append(client.starting_amount)
+        current_amounts.append(client.current_amount)
+    tables = []
+    for strings in (names, banks):
+        encoded = [string.encode() for string in strings]
+        offsets = array('Q', [0])
+        for string in encoded:
+            offsets.append(offsets[-1] + len(string))
+        tables.append((offsets, b''.join(encoded)))
+    byte_order = 1 if sys.byteorder == 'little' else 2
+    with open(binary_filename + '.tmp', 'wb') as file:
+        file.write(_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, byte_order, len(account_ages),
+                                       len(names), len(banks)))
+        blocks = [account_ages, starting_amounts, current_amounts, name_ids, bank_ids,
+                  tables[0][0], tables[1][0], tables[0][1], tables[1][1]]
+        for block in blocks:
+            data = block if isinstance(block, bytes) else block.tobytes()
+            file.write(data + bytes(_padding(len(data))))
+    os.replace(binary_filename + '.tmp', binary_filename)
+    return len(account_ages)
+
+
+def is_binary_ledger(filename: str) -> bool:
+    """
+    Check whether the file is in the binary ledger format.
+
+    :param filename: name of the file.
+    :return: True if the file starts with the binary ledger magic bytes.
+    """
+    with open(filename, 'rb') as file:
+        return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+class _StringTable:
+    """Table of distinct strings in a mapped file, decoded one at a time when they are needed."""
+
+    def __init__(self, buffer, offsets, start: int):
+        """
+        _StringTable constructor.
+
+        :param buffer: mapped file.
+        :param offsets: where every string starts and the last one ends, relative to start.
+        :param start: offset of the encoded strings in the buffer.
+        """
+        self.buffer = buffer
+        self.offsets = offsets
+        self.start = start
+
+    def __len__(self):
+        """
+        Table length.
+
+        :return: amount of strings.
+        """
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        """
+        Decode one string.
+
+        :param index: string id.
+        :return: string.
+        """
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.buffer[self.start + start:self.start + end].decode()
+
+
+class _StringColumn:
+    """Column of strings stored as ids into a table of distinct strings."""
+
+    def __init__(self, ids, strings):
+        """
+        _StringColumn constructor.
+
+        :param ids: string id of every row
+        :param strings: distinct strings
+        """
+        self.ids = ids
+        self.strings = strings
+
+    def __len__(self):
+        """
+        Column length.
+
+        :return: amount of rows.
+        """
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> str:
+        """
+        Get the string of a row.
+
+        :param index: row number.
+        :return: string.
+        """
+        return self.strings[self.ids[index]]
+
+
+class BinaryLedger:
+    """
+    Client file in the binary ledger format (see write_binary_ledger), read through a memory map.
+
+    Nothing is parsed when the ledger is opened: the numeric columns are used straight from the mapped file,
+    names are decoded only when a client is made and only the small table of distinct banks is decoded.
+    """
+
+    def __init__(self, filename: str):
+        """
+        BinaryLedger constructor.
+
+        :param filename: name of the binary file.
+        """
+        with open(filename, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order, rows, name_count, bank_count = _BINARY_HEADER.unpack_from(self._map)
+        if magic != BINARY_MAGIC:
+            raise ValueError(f"{filename} is not a binary client ledger")
+        if version != BINARY_VERSION:
+            raise ValueError(f"{filename} is a version {version} binary ledger, "
+                             "write it again with write_binary_ledger")
+        if byte_order != (1 if sys.byteorder == 'little' else 2):
+            raise ValueError(f"{filename} was written on a machine with a different byte order")
+        offset = _BINARY_HEADER.size
+        columns = []
+        for code, count in (('q', rows), ('q', rows), ('q', rows), ('I', rows), ('I', rows),
+                            ('Q', name_count + 1), ('Q', bank_count + 1)):
+            size = array(code).itemsize * count
+            if np is not None:
+                columns.append(np.frombuffer(self._map, dtype=np.dtype(code), count=count, offset=offset))
+            else:
+                columns.append(memoryview(self._map)[offset:offset + size].cast(code))
+            offset += size + _padding(size)
+        account_ages, starting_amounts, current_amounts, name_ids, bank_ids, name_offsets, bank_offsets = columns
+        names = _StringTable(self._map, name_offsets, offset)
+        size = int(name_offsets[-1])
+        bank_table = _StringTable(self._map, bank_offsets, offset + size + _padding(size))
+        self.bank_names = [bank_table[i] for i in range(bank_count)]
+        self._bank_ids = {bank: bank_id for bank_id, bank in enumerate(self.bank_names)}
+        self.names = _StringColumn(name_ids, names)
+        self.banks = _StringColumn(bank_ids, self.bank_names)
+        self.account_ages = account_ages
+        self.starting_amounts = starting_amounts
+        self.current_amounts = current_amounts
+        self._ledger = None
+
+    def __len__(self):
+        """
+        Ledger length.
+
+        :return: amount of clients.
+        """
+        return len(self.account_ages)
+
+    def client(self, index: int) -> Client:
+        """
+        Make a client object out of one row.
+
+        :param index: row number.
+        :return: client.
+        """
+        return Client(self.names[index], self.banks[index], int(self.account_ages[index]),
+                      int(self.starting_amounts[index]), int(self.current_amounts[index]))
+
+    def __iter__(self):
+        """
+        Go through the clients in file order.
+
+        :return: generator of clients.
+        """
+        return (self.client(index) for index in range(len(self)))
+
+    def ledger(self) -> ClientLedger:
+        """
+        Get the clients as a columnar ledger that shares the mapped columns.
+
+        :return: ledger.
+        """
+        if self._ledger is None:
+            self._ledger = ClientLedger(self.names, self.banks, self.account_ages,
+                                        self.starting_amounts, self.current_amounts)
+        return self._ledger
+
+    def filter_by_bank(self, bank: str) -> list:
+        """
+        Find the clients of the bank.
+
+        :param bank: to filter by.
+        :return: filtered list of people.
+        """
+        bank_id = self._bank_ids.get(bank)
+        if bank_id is None:
+            return []
+        bank_ids = self.banks.ids
+        if np is not None:
+            rows = np.flatnonzero(bank_ids == bank_id)
+        else:
+            rows = [row for row, value in enumerate(bank_ids) if value == bank_id]
+        return [self.client(int(row)) for row in rows]
+
+    def largest_earnings_per_day(self) -> Optional[Client]:
+        """
+        Find the client that has earned the most money per day.
+
+        :return: client with largest earnings.
+        """
+        clients = self.ledger().top_k_earners(1)
+        return clients[0] if clients else None
+
+    def largest_loss_per_day(self) -> Optional[Client]:
+        """
+        Find the client that has lost the most money per day.
+
+        :return: client with largest loss.
+        """
+        clients = self.ledger().top_k_losers(1)
+        return clients[0] if clients else None
+
+
+class ClientStore:
+    """
+    Cache of parsed client files.
+
+    A file is parsed once and kept in memory together with its size and modification time.
+    As long as those stay the same, every query is answered from memory.
+    When the file changes, it is parsed again on the next query.
+
+    Files bigger than max_cache_bytes are not kept in memory at all,
+    queries on them go through the file in a single streaming pass instead.
+    At most max_files files whose sizes add up to at most max_total_bytes are kept,
+    the least recently used file is forgotten first (the file being queried is always kept).
+    Files in the binary ledger format (see write_binary_ledger) are read through BinaryLedger.
+
+    The clients returned by queries are the cached objects themselves, shared with every other caller:
+    copy a client before changing it.
+    """
+
+    def __init__(self, max_cache_bytes: Optional[int] = None, max_files: Optional[int] = None,
+                 max_total_bytes: Optional[int] = None):
+        """
+        ClientStore constructor.
+
+        :param max_cache_bytes: size of the biggest file to keep in memory, None for no limit.
+        :param max_files: amount of files to keep in memory, None for no limit.
+        :param max_total_bytes: total size of the files to keep in memory, None for no limit.
+        """
+        self.max_cache_bytes = max_cache_bytes
+        self.max_files = max_files
+        self.max_total_bytes = max_total_bytes
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+
+    def _entry(self, filename: str) -> dict:
+        """
+        Get the cache entry of the file, dropping it if the file has changed.
+
+        :param filename: name of file to get info from.
+        :return: dict with the path and the views of the file that have been made so far.
+        """
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._cache.get(path)
+        if cached is None or cached[0] != key:
+            self.invalidate(path)
+            cached = (key, {"path": path})
+            self._cache[path] = cached
+            self._cached_bytes += key[0]
+            self._evict()
+        else:
+            self._cache.move_to_end(path)
+        return cached[1]
+
+    def _evict(self):
+        """Forget the least recently used files until the limits are met, keeping the most recent one."""
+        while len(self._cache) > 1 and (
+                (self.max_files is not None and len(self._cache) > self.max_files)
+                or (self.max_total_bytes is not None and self._cached_bytes > self.max_total_bytes)):
+            key, _ = self._cache.popitem(last=False)[1]
+            self._cached_bytes -= key[0]
+
+    def load(self, filename: str) -> list:
+        """
+        Get the clients of the file, parsing it only if it has changed since the last time.
+
+        The returned list is shared between callers and must not be modified.
+
+        :param filename: name of file to get info from.
+        :return: list of clients.
+        """
+        entry = self._entry(filename)
+        if "clients" not in entry:
+            if is_binary_ledger(entry["path"]):
+                entry["clients"] = list(BinaryLedger(entry["path"]))
+            else:
+                entry["clients"] = _parse_clients(entry["path"])
+        return entry["clients"]
+
+    def ledger(self, filename: str) -> ClientLedger:
+        """
+        Get the clients of the file as a columnar ledger, parsing it only if it has changed since the last time.
+
+        :param filename: name of file to get info from.
+        :return: ledger.
+        """
+        entry = self._entry(filename)
+        if "ledger" not in entry:
+            if is_binary_ledger(entry["path"]):
+                entry["ledger"] = BinaryLedger(entry["path"]).ledger()
+            elif "clients" in entry:
+                entry["ledger"] = ClientLedger.from_clients(entry["clients"])
+            else:
+                entry["ledger"] = ClientLedger.from_file(entry["path"])
+        return entry["ledger"]
+
+    def _clients(self, filename: str):
+        """
+        Get the clients of the file for a single pass.
+
+        :param filename: name of file to get info from.
+        :return: cached list of clients, or a generator reading the file if it is too big to cache.
+        """
+        path = os.path.abspath(filename)
+        if self.max_cache_bytes is not None and os.path.getsize(path) > self.max_cache_bytes:
+            self.invalidate(path)
+            return iter(BinaryLedger(path)) if is_binary_ledger(path) else iter_clients(path)
+        return self.load(path)
+
+    def invalidate(self, filename: Optional[str] = None):
+        """
+        Forget the cached clients.
+
+        :param filename: file to forget, or None to forget every file.
+        """
+        if filename is None:
+            self._cache.clear()
+            self._cached_bytes = 0
+        else:
+            cached = self._cache.pop(os.path.abspath(filename), None)
+            if cached is not None:
+                self._cached_bytes -= cached[0][0]
+
+    def filter_by_bank(self, filename: str, bank: str) -> list:
+        """
+        Find the clients of the bank.
+
+        :param filename: name of file to get info from.
+        :param bank: to filter by.
+        :return: filtered list of people.
+        """
+        return [client for client in self._clients(filename) if client.bank == bank]
+
+    def largest_earnings_per_day(self, filename: str) -> Optional[Client]:
+        """
+        Find the client that has earned the most money per day.
+
+        :param filename: name of file to get info from.
+        :return: client with largest earnings.
+        """
+        return _largest_earner(self._clients(filename))
+
+    def largest_loss_per_day(self, filename: str) -> Optional[Client]:
+        """
+        Find the client that has lost the most money per day.
+
+        :param filename: name of file to get info from.
+        :return: client with largest loss.
+        """
+        return _largest_loser(self._clients(filename))
+
+
+class ClientFollower:
+    """
+    Follower of an append-only client file.
+
+    Every refresh reads only the bytes that have been appended since the previous one,
+    and keeps the largest earner, the largest loser and the clients of every bank up to date.
+    A last line without a line break is counted, but read again on the next refresh
+    in case it was still being written.
+    If the file gets shorter or is replaced, it is followed again from the start.
+    """
+
+    def __init__(self, filename: str, chunk_size: int = CHUNK_SIZE):
+        """
+        ClientFollower constructor.
+
+        :param filename: name of file to follow.
+        :param chunk_size: amount of bytes to read at a time.
+        """
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self._reset(None)
+
+    def _reset(self, inode: Optional[int]):
+        """
+        Forget everything that has been read.
+
+        :param inode: inode of the file that is followed from now on.
+        """
+        self.offset = 0
+        self._inode = inode
+        self._earner = None
+        self._loser = None
+        self._banks = {}
+        self._tail = None
+
+    def _add(self, client: Client):
+        """
+        Count in a client from a complete line.
+
+        :param client: client to add.
+        """
+        self._earner, self._loser = _extremes([c for c in (self._earner, self._loser, client) if c is not None])
+        self._banks.setdefault(client.bank, []).append(client)
+
+    def refresh(self) -> int:
+        """
+        Read the lines appended to the file since the last refresh.
+
+        The offset moves past every line as soon as it has been counted in, so if a line cannot be parsed,
+        the error is raised and the next refresh starts again from that line.
+
+        :return: amount of new bytes that were read.
+        """
+        stat = os.stat(self.filename)
+        if stat.st_ino != self._inode or stat.st_size < self.offset:
+            self._reset(stat.st_ino)
+        start = self.offset
+        self._tail = None
+        with open(self.filename, 'rb') as file:
+            file.seek(self.offset)
+            rest = b''
+            while True:
+                chunk = file.read(self.chunk_size)
+                if not chunk:
+                    break
+                lines = (rest + chunk).split(b'\n')
+                rest = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        self._add(_parse_client(line.decode()))
+                    self.offset += len(line) + 1
+        if rest.strip():
+            try:
+                self._tail = _parse_client(rest.decode())
+            except ValueError:
+                pass
+        return self.offset + len(rest) - start
+
+    @property
+    def largest_earner(self) -> Optional[Client]:
+        """
+        Client that has earned the most money per day in the lines read so far.
+
+        :return: client with largest earnings.
+        """
+        return _largest_earner(client for client in (self._earner, self._tail) if client is not None)
+
+    @property
+    def largest_loser(self) -> Optional[Client]:
+        """
+        Client that has lost the most money per day in the lines read so far.
+
+        :return: client with largest loss.
+        """
+        return _largest_loser(client for client in (self._loser, self._tail) if client is not None)
+
+    def filter_by_bank(self, bank: str) -> list:
+        """
+        Find the clients of the bank in the lines read so far.
+
+        :param bank: to filter by.
+        :return: filtered list of people.
+        """
+        clients = list(self._banks.get(bank, []))
+        if self._tail is not None and self._tail.bank == bank:
+            clients.append(self._tail)
+        return clients
+
+
+# Files bigger than max_cache_bytes are streamed by the module functions instead of parsed into memory,
+# so they work on ledgers bigger than RAM.
+_store = ClientStore(max_cache_bytes=128 << 20, max_files=4, max_total_bytes=512 << 20)
+_bank_indexes = {}
+
+
+def _line_ranges(filename: str, shards: int) -> list:
+    """
+    Split the file into byte ranges that start and end on line boundaries.
+
+    :param filename: name of the file.
+    :param shards: amount of ranges wanted.
+    :return: list of (start, end) byte ranges covering the whole file, in file order.
+    """
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, 'rb') as file:
+        for shard in range(1, shards):
+            position = size * shard // shards
+            if position <= bounds[-1]:
+                continue
+            file.seek(position - 1)
+            file.readline()
+            position = file.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+
+def _iter_range(filename: str, start: int, end: int):
+    """
+    Read the clients whose rows start inside the byte range.
+
+    :param filename: name of file to get info from.
+    :param start: offset of the first row.
+    :param end: offset after the last row.
+    :return: generator of clients.
+    """
+    with open(filename, 'rb') as file:
+        file.seek(start)
+        position = start
+        for line in file:
+            if position >= end:
+                break
+            position += len(line)
+            if line.strip():
+                yield _parse_client(line.decode())
+
+
+def _scan_range(shard: tuple) -> tuple:
+    """
+    Find the largest earner and loser of one shard, run in a worker process.
+
+    :param shard: (filename, start, end)
+    :return: client with largest earnings and client with largest loss of the shard.
+    """
+    filename, start, end = shard
+    return _extremes(_iter_range(filename, start, end))
+
+
+def largest_per_day_parallel(filename: str, workers: Optional[int] = None) -> tuple:
+    """
+    Find the clients with the largest earnings and the largest loss per day using several processes.
+
+    The file is split into line-aligned byte ranges that are scanned in a process pool.
+    The winners of the ranges are then compared in file order with the same rules as in
+    largest_earnings_per_day and largest_loss_per_day, so the result is the same as theirs.
+    Compressed files cannot be split and are scanned in one pass instead.
+    Binary ledgers are answered from their mapped columns without a process pool.
+
+    :param filename: name of file to get info from.
+    :param workers: amount of processes, the amount of CPUs by default.
+    :return: client with largest earnings and client with largest loss (either can be None).
+    """
+    workers = workers or os.cpu_count() or 1
+    path = os.path.abspath(filename)
+    if is_binary_ledger(path):
+        ledger = BinaryLedger(path)
+        return ledger.largest_earnings_per_day(), ledger.largest_loss_per_day()
+    if _compression(path) is not None:
+        return _extremes(iter_clients(path))
+    shards = [(path, start, end) for start, end in _line_ranges(path, workers * 4)]
+    if workers == 1 or len(shards) <= 1:
+        results = [_scan_range(shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_scan_range, shards))
+    return (_largest_earner(earner for earner, _ in results if earner is not None),
+            _largest_loser(loser for _, loser in results if loser is not None))
+
+
+def _file_key(filename: str) -> tuple:
+    """
+    Get what identifies the current version of the file.
+
+    :param filename: name of the file.
+    :return: size and modification time of the file.
+    """
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build_bank_index(filename: str) -> dict:
+    """
+    Find the byte offsets of the rows of every bank and save them next to the file.
+
+    The index is saved as "<filename>.idx": a header with the size and modification time of the file,
+    so it can be told apart from an index of an older version of the file, a directory of the banks
+    with where their offsets are and how many there are, and the offsets of every bank as one 8 byte integer block.
+    Binary ledgers cannot be indexed, they have a bank table of their own (see BinaryLedger).
+
+    :param filename: name of file to get info from.
+    :return: dict of bank names and the position and amount of their offsets in the index.
+    """
+    if is_binary_ledger(filename):
+        raise ValueError(f"{filename} is a binary ledger, it needs no bank index")
+    key = _file_key(filename)
+    banks = {}
+    offset = 0
+    with open(filename, 'rb') as file:
         for line in file:
-            name, bank, account_age, starting_amount, current_amount = line.strip().split(',')
-            account_age = int(account_age)
-            starting_amount = int(starting_amount)
-            current_amount = int(current_amount)
-            clients.append(Client(name, bank, account_age, starting_amount, current_amount))
+            if line.strip():
+                bank = line.split(b',', 2)[1].decode()
+                banks.setdefault(bank, array('Q')).append(offset)
+            offset += len(line)
+    encoded = {bank: bank.encode() for bank in banks}
+    position = _INDEX_HEADER.size + sum(_INDEX_ENTRY.size + len(name) for name in encoded.values())
+    position += _padding(position)
+    directory = {}
+    for bank, offsets in banks.items():
+        directory[bank] = (position, len(offsets))
+        position += offsets.itemsize * len(offsets)
+    byte_order = 1 if sys.byteorder == 'little' else 2
+    index_name = filename + INDEX_SUFFIX
+    with open(index_name + '.tmp', 'wb') as file:
+        file.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, byte_order, key[0], key[1], len(banks)))
+        for bank, name in encoded.items():
+            file.write(_INDEX_ENTRY.pack(*directory[bank], len(name)) + name)
+        file.write(bytes(_padding(file.tell())))
+        for offsets in banks.values():
+            offsets.tofile(file)
+    os.replace(index_name + '.tmp', index_name)
+    _bank_indexes[os.path.abspath(filename)] = (key, directory)
+    return directory
+
+
+def _read_index_directory(filename: str, key: tuple) -> Optional[dict]:
+    """
+    Read the header and the bank directory of the saved bank index, but none of the offsets.
+
+    :param filename: name of the indexed file.
+    :param key: size and modification time of the file.
+    :return: dict of bank names and the position and amount of their offsets, None if there is no usable index.
+    """
+    try:
+        with open(filename + INDEX_SUFFIX, 'rb') as file:
+            header = file.read(_INDEX_HEADER.size)
+            if len(header) != _INDEX_HEADER.size:
+                return None
+            magic, version, byte_order, size, mtime_ns, bank_count = _INDEX_HEADER.unpack(header)
+            if (magic != INDEX_MAGIC or version != INDEX_VERSION
+                    or byte_order != (1 if sys.byteorder == 'little' else 2) or (size, mtime_ns) != key):
+                return None
+            directory = {}
+            for _ in range(bank_count):
+                position, count, length = _INDEX_ENTRY.unpack(file.read(_INDEX_ENTRY.size))
+                directory[file.read(length).decode()] = (position, count)
+            return directory
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def load_bank_index(filename: str) -> dict:
+    """
+    Get the bank directory of the bank index, building the index again if the file has changed since it was made.
+
+    Only the header and the directory are read, the offsets are read one bank at a time by read_bank_offsets.
+
+    :param filename: name of file to get info from.
+    :return: dict of bank names and the position and amount of their offsets in the index.
+    """
+    key = _file_key(filename)
+    cached = _bank_indexes.get(os.path.abspath(filename))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    directory = _read_index_directory(filename, key)
+    if directory is None:
+        return build_bank_index(filename)
+    _bank_indexes[os.path.abspath(filename)] = (key, directory)
+    return directory
+
+
+def read_bank_offsets(filename: str, bank: str) -> array:
+    """
+    Read the byte offsets of the rows of one bank from the bank index.
+
+    :param filename: name of file to get info from.
+    :param bank: to get the offsets of.
+    :return: offsets of the rows of the bank, in file order.
+    """
+    offsets = array('Q')
+    entry = load_bank_index(filename).get(bank)
+    if entry is not None:
+        position, count = entry
+        with open(filename + INDEX_SUFFIX, 'rb') as file:
+            file.seek(position)
+            offsets.fromfile(file, count)
+    return offsets
+
+
+def filter_by_bank_indexed(filename: str, bank: str) -> list:
+    """
+    Find the clients of the bank by reading only their rows.
+
+    Compressed files cannot be read from the middle, so they are scanned instead,
+    and so are files whose index cannot be saved.
+    Binary ledgers have a bank table of their own and are filtered through BinaryLedger.
+
+    :param filename: name of file to get info from.
+    :param bank: to filter by.
+    :return: filtered list of people.
+    """
+    if is_binary_ledger(filename):
+        return BinaryLedger(filename).filter_by_bank(bank)
+    if _compression(filename) is not None:
+        return [client for client in iter_clients(filename) if client.bank == bank]
+    try:
+        offsets = read_bank_offsets(filename, bank)
+    except OSError:
+        return [client for client in iter_clients(filename) if client.bank == bank]
+    clients = []
+    with open(filename, 'rb') as file:
+        for offset in offsets:
+            file.seek(offset)
+            clients.append(_parse_client(file.readline().decode()))
     return clients
 
 
-def filter_by_bank(filename: str, bank: str) -> list:
+def read_from_file_into_list(filename: str) -> list:
+    """
+    Read from the file, make client objects and add the clients into a list.
+
+    The list is new, but the clients in it are shared with the cache and must not be modified.
+
+    :param filename: name of file to get info from.
+    :return: list of clients.
+    """
+    return list(_store.load(filename))
+
+
+def filter_by_bank(filename: str, bank: str, use_index: bool = False) -> list:
     """
     Find the clients of the bank.
 
+    Without the index, the clients are shared with the cache and must not be modified.
+
     :param filename: name of file to get info from.
     :param bank: to filter by.
+    :param use_index: read only the rows of the bank with the help of the bank index (see build_bank_index).
     :return: filtered list of people.
     """
-    clients = read_from_file_into_list(filename)
-    return [client for client in clients if client.bank == bank]
+    if use_index:
+        return filter_by_bank_indexed(filename, bank)
+    return _store.filter_by_bank(filename, bank)
 
 
 def largest_earnings_per_day(filename: str) -> Optional[Client]:
@@ -89,14 +1179,7 @@ def largest_earnings_per_day(filename: str) -> Optional[Client]:
     :param filename: name of file to get info from.
     :return: client with largest earnings.
     """
-    clients = read_from_file_into_list(filename)
-    max_earnings = None
-    for client in clients:
-        if client.earnings_per_day() > 0:
-            if not max_earnings or client.earnings_per_day() > max_earnings.earnings_per_day() or (
-                    client.earnings_per_day() == max_earnings.earnings_per_day() and client.account_age < max_earnings.account_age):
-                max_earnings = client
-    return max_earnings
+    return _store.largest_earnings_per_day(filename)
 
 
 def largest_loss_per_day(filename: str) -> Optional[Client]:
@@ -109,18 +1192,14 @@ def largest_loss_per_day(filename: str) -> Optional[Client]:
     :param filename: name of file to get info from.
     :return: client with largest loss.
     """
-    clients = read_from_file_into_list(filename)
-    max_loss = None
-    for client in clients:
-        if client.earnings_per_day() < 0:
-            if not max_loss or client.earnings_per_day() < max_loss.earnings_per_day() or (
-                    client.earnings_per_day() == max_loss.earnings_per_day() and client.account_age < max_loss.account_age):
-                max_loss = client
-    return max_loss
+    return _store.largest_loss_per_day(filename)
 
 
 if __name__ == '__main__':
     print(read_from_file_into_list("clients_info.txt"))  # -> [Ann, Mark, Josh, Jonah, Franz]
     print(filter_by_bank("clients_info.txt", "Sprint"))  # -> [Ann, Mark]
+    print(filter_by_bank("clients_info.txt", "Sprint", use_index=True))  # -> [Ann, Mark]
     print(largest_earnings_per_day("clients_info.txt"))  # -> Josh
-    print(largest_loss_per_day("clients_info.txt"))  # -> Franz
\ No newline at end of file
+    print(largest_loss_per_day("clients_info.txt"))  # -> Franz
+    print(largest_per_day_parallel("clients_info.txt"))  # -> (Josh, Franz)
+    print(ClientLedger.from_file("clients_info.txt").top_k_earners(2))  # -> [Josh, Jonah]
\ No newline at end of file
@@ -1,4 +1,18 @@
 """Simple Poker implementation."""
+from array import array
+from collections import Counter
+from itertools import combinations_with_replacement
+from math import prod
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAND_TYPES = ("high card", "pair", "three of a kind", "straight", "flush", "full house", "four of a kind",
+              "straight flush")
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+BATCH_ROWS = 1 << 18
 
 
 class Card:
@@ -106,6 +120,13 @@ class Hand:
         """ Return the type of the hand. """
         if len(self.cards) < 5:
             return None
+        if len(self.cards) == 5:
+            try:
+                codes = [CARD_CODES[card.value, card.suit] for card in self.cards]
+            except KeyError:
+                pass
+            else:
+                return HAND_TYPES[classify(codes)]
         if self.is_straight_flush():
             return "straight flush"
         elif self.is_flush():
@@ -131,6 +152,100 @@ class Hand:
         else:
             return f"I'm holding {', '.join(str(card) for card in self.cards)}"
 
+
+CARD_CODES = {(value, suit): rank * 4 + suit_index
+              for rank, value in enumerate(Hand.values) for suit_index, suit in enumerate(Hand.suits)}
+CARD_BITS = [1 << (16 + code // 4) | 1 << (12 + code % 4) for code in range(52)]
+CARD_PRIMES = [PRIMES[code // 4] for code in range(52)]
+
+
+def _build_tables():
+    """ Build the hand type tables of flushes by rank mask and of other hands by product of rank primes. """
+    straights = {0b11111 << low for low in range(9)}
+    flushes = [HAND_TYPES.index("straight flush" if mask in straights else "flush") for mask in range(1 << 13)]
+    products = {}
+    for ranks in combinations_with_replacement(range(13), 5):
+        counts = sorted(Counter(ranks).values())
+        if counts == [2, 3]:
+            hand_type = "full house"
+        elif 4 in counts:
+            hand_type = "four of a kind"
+        elif 3 in counts:
+            hand_type = "three of a kind"
+        elif 2 in counts:
+            hand_type = "pair"
+        elif sum(1 << rank for rank in ranks) in straights:
+            hand_type = "straight"
+        else:
+            hand_type = "high card"
+        products[prod(PRIMES[rank] for rank in ranks)] = HAND_TYPES.index(hand_type)
+    return flushes, products
+
+
+FLUSH_TABLE, PRODUCT_TABLE = _build_tables()
+
+
+def classify(codes) -> int:
+    """
+    Return the index in HAND_TYPES of a hand of 5 card codes.
+
+    A card code is rank * 4 + suit, with ranks and suits in the order of Hand.values and Hand.suits.
+    """
+    c1, c2, c3, c4, c5 = codes
+    bits = CARD_BITS
+    if bits[c1] & bits[c2] & bits[c3] & bits[c4] & bits[c5] & 0xF000:
+        return FLUSH_TABLE[(bits[c1] | bits[c2] | bits[c3] | bits[c4] | bits[c5]) >> 16]
+    primes = CARD_PRIMES
+    return PRODUCT_TABLE[primes[c1] * primes[c2] * primes[c3] * primes[c4] * primes[c5]]
+
+
+if np is not None:
+    _CARD_BITS = np.array(CARD_BITS, dtype=np.uint32)
+    _CARD_PRIMES = np.array(CARD_PRIMES, dtype=np.int64)
+    _FLUSH_TYPES = np.array(FLUSH_TABLE, dtype=np.uint8)
+    _PRODUCT_KEYS = np.array(sorted(PRODUCT_TABLE), dtype=np.int64)
+    _PRODUCT_TYPES = np.array([PRODUCT_TABLE[key] for key in sorted(PRODUCT_TABLE)], dtype=np.uint8)
+
+
+def _classify_rows(codes):
+    """ Classify an N x 5 NumPy array of card codes. """
+    bits = _CARD_BITS[codes]
+    flushes = np.bitwise_and.reduce(bits, axis=1) & 0xF000 != 0
+    masks = np.bitwise_or.reduce(bits, axis=1) >> 16
+    products = _CARD_PRIMES[codes].prod(axis=1)
+    types = _PRODUCT_TYPES[np.searchsorted(_PRODUCT_KEYS, products)]
+    types[flushes] = _FLUSH_TYPES[masks[flushes]]
+    return types
+
+
+def classify_many(hands) -> tuple:
+    """
+    Classify a batch of hands given as rows of 5 card codes.
+
+    Return the index in HAND_TYPES of every row and a histogram of how many rows have each hand type.
+    With NumPy the rows are classified in vectorized chunks, otherwise one by one with classify.
+    The rows are not validated beyond the card codes being in range.
+    """
+    if np is None:
+        types = array('B', map(classify, hands))
+        counts = [0] * len(HAND_TYPES)
+        for hand_type in types:
+            counts[hand_type] += 1
+        return types, dict(zip(HAND_TYPES, counts))
+    codes = np.asarray(hands, dtype=np.intp)
+    if codes.size == 0:
+        codes = codes.reshape(0, 5)
+    if codes.ndim != 2 or codes.shape[1] != 5:
+        raise ValueError("Hands must be an N x 5 array of card codes")
+    if codes.size and (codes.min() < 0 or codes.max() > 51):
+        raise ValueError("Card codes must be between 0 and 51")
+    types = np.empty(len(codes), dtype=np.uint8)
+    for start in range(0, len(codes), BATCH_ROWS):
+        types[start:start + BATCH_ROWS] = _classify_rows(codes[start:start + BATCH_ROWS])
+    counts = np.bincount(types, minlength=len(HAND_TYPES))
+    return types, dict(zip(HAND_TYPES, counts.tolist()))
+
+
 if __name__ == "__main__":
     hand = Hand()
     cards = [Card("2", "diamonds"), Card("4", "spades"), Card("5", "clubs"), Card("3", "diamonds"), Card("6", "hearts")]
@@ -0,0 +1,195 @@
+"""Monte Carlo equity simulator for poker hands."""
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Optional
+
+from poker import CARD_BITS, CARD_CODES, CARD_PRIMES, FLUSH_TABLE, HAND_TYPES, PRODUCT_TABLE, PRIMES, Card
+
+
+def _build_strengths():
+    """ Rank every 5-card hand by hand type, then by how many cards share a value, then by the values. """
+    keys = {}
+    for product, hand_type in PRODUCT_TABLE.items():
+        ranks = [rank for rank, prime in enumerate(PRIMES) for _ in range(_multiplicity(product, prime))]
+        counts = Counter(ranks)
+        ordered = sorted(counts, key=lambda rank: (counts[rank], rank), reverse=True)
+        keys[("product", product)] = (hand_type, tuple(sorted(counts.values(), reverse=True)), tuple(ordered))
+    for mask, hand_type in enumerate(FLUSH_TABLE):
+        if bin(mask).count("1") == 5:
+            ordered = tuple(rank for rank in reversed(range(13)) if mask >> rank & 1)
+            keys[("flush", mask)] = (hand_type, (1, 1, 1, 1, 1), ordered)
+    order = {key: strength for strength, key in enumerate(sorted(set(keys.values())))}
+    flushes = [0] * len(FLUSH_TABLE)
+    products = {}
+    for (kind, index), key in keys.items():
+        if kind == "flush":
+            flushes[index] = order[key]
+        else:
+            products[index] = order[key]
+    types = [key[0] for key in sorted(order, key=order.get)]
+    return flushes, products, types
+
+
+def _multiplicity(product: int, prime: int) -> int:
+    """ Return how many times the prime divides the product. """
+    count = 0
+    while product % prime == 0:
+        product //= prime
+        count += 1
+    return count
+
+
+FLUSH_STRENGTH, PRODUCT_STRENGTH, STRENGTH_TYPES = _build_strengths()
+
+
+def strength(codes) -> int:
+    """
+    Return the strength of a hand of 5 different card codes, a stronger hand has a bigger strength.
+
+    STRENGTH_TYPES[strength] is the index in HAND_TYPES of the hand.
+    """
+    c1, c2, c3, c4, c5 = codes
+    bits = CARD_BITS
+    if bits[c1] & bits[c2] & bits[c3] & bits[c4] & bits[c5] & 0xF000:
+        return FLUSH_STRENGTH[(bits[c1] | bits[c2] | bits[c3] | bits[c4] | bits[c5]) >> 16]
+    primes = CARD_PRIMES
+    return PRODUCT_STRENGTH[primes[c1] * primes[c2] * primes[c3] * primes[c4] * primes[c5]]
+
+
+def card_codes(cards: list) -> list:
+    """ Return the card codes of a list of cards. """
+    return [CARD_CODES[card.value, card.suit] for card in cards]
+
+
+def _simulate_batch(batch: tuple) -> tuple:
+    """ Deal and evaluate one batch of trials with its own random stream. """
+    hands, deck, trials, seed, index = batch
+    rng = random.Random(f"{seed}/{index}")
+    players = len(hands)
+    missing = [5 - len(hand) for hand in hands]
+    needed = sum(missing)
+    wins = [0] * players
+    ties = [0] * players
+    shares = [0.0] * players
+    squares = [0.0] * players
+    categories = [[0] * len(HAND_TYPES) for _ in hands]
+    for _ in range(trials):
+        dealt = rng.sample(deck, needed)
+        strengths = []
+        position = 0
+        for player, hand in enumerate(hands):
+            value = strength(hand + dealt[position:position + missing[player]])
+            position += missing[player]
+            strengths.append(value)
+            categories[player][STRENGTH_TYPES[value]] += 1
+        best = max(strengths)
+        winners = [player for player, value in enumerate(strengths) if value == best]
+        share = 1 / len(winners)
+        for player in winners:
+            if len(winners) == 1:
+                wins[player] += 1
+            else:
+                ties[player] += 1
+            shares[player] += share
+            squares[player] += share * share
+    return wins, ties, shares, squares, categories
+
+
+def simulate(hands: list, trials: int = 100000, workers: Optional[int] = None, seed: int = 0,
+             batch_size: int = 10000, target_half_width: Optional[float] = None, confidence: float = 0.95,
+             time_limit: Optional[float] = None, dead: list = ()) -> dict:
+    """
+    Estimate the hand type probabilities and the equity of partial hands.
+
+    Every hand is a list of at most 5 card codes (or Card objects) and is completed with random cards
+    from the rest of the deck, then the completed hands are compared. A player's equity is the share
+    of the pot they win on average, a tie splits the pot evenly between the best hands.
+    Trials run in batches of batch_size, each with its own random stream seeded from seed and the batch
+    number, spread over a process pool. Batches are counted in order, so the result only depends on
+    the seed and the amount of trials, not on the amount of workers.
+    Simulation stops early when the confidence interval of every equity is at most target_half_width
+    wide on each side, or after time_limit seconds (which makes the result depend on timing).
+    """
+    hands = [card_codes(hand) if hand and isinstance(hand[0], Card) else list(hand) for hand in hands]
+    dead = card_codes(dead) if dead and isinstance(dead[0], Card) else list(dead)
+    used = [code for hand in hands for code in hand] + dead
+    if not hands:
+        raise ValueError("At least one hand is needed")
+    if any(len(hand) > 5 for hand in hands):
+        raise ValueError("Every hand must have at most 5 cards")
+    if len(set(used)) != len(used) or any(not 0 <= code < 52 for code in used):
+        raise ValueError("Cards must be different card codes between 0 and 51")
+    taken = set(used)
+    deck = [code for code in range(52) if code not in taken]
+    if sum(5 - len(hand) for hand in hands) > len(deck):
+        raise ValueError("Not enough cards left in the deck")
+    workers = workers or os.cpu_count() or 1
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    batches = [(hands, deck, min(batch_size, trials - start), seed, index)
+               for index, start in enumerate(range(0, trials, batch_size))]
+    players = len(hands)
+    done, wins, ties = 0, [0] * players, [0] * players
+    shares, squares = [0.0] * players, [0.0] * players
+    categories = [[0] * len(HAND_TYPES) for _ in hands]
+    half_widths = [float("inf")] * players
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+
+    def count(result: tuple, size: int) -> bool:
+        """ Add a batch to the totals, return whether the simulation can stop. """
+        nonlocal done
+        done += size
+        for player in range(players):
+            wins[player] += result[0][player]
+            ties[player] += result[1][player]
+            shares[player] += result[2][player]
+            squares[player] += result[3][player]
+            for hand_type, amount in enumerate(result[4][player]):
+                categories[player][hand_type] += amount
+            mean = shares[player] / done
+            variance = max(squares[player] / done - mean * mean, 0.0) * done / max(done - 1, 1)
+            half_widths[player] = z * (variance / done) ** 0.5
+        if target_half_width is not None and max(half_widths) <= target_half_width:
+            return True
+        return deadline is not None and time.monotonic() >= deadline
+
+    if workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            if count(_simulate_batch(batch), batch[2]):
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = []
+            for batch in batches:
+                pending.append((executor.submit(_simulate_batch, batch), batch[2]))
+                if len(pending) < 2 * workers:
+                    continue
+                future, size = pending.pop(0)
+                if count(future.result(), size):
+                    break
+            else:
+                while pending:
+                    future, size = pending.pop(0)
+                    if count(future.result(), size):
+                        break
+            for future, _ in pending:
+                future.cancel()
+    return {
+        "trials": done,
+        "equity": [share / done for share in shares] if done else [0.0] * players,
+        "win": [win / done for win in wins] if done else [0.0] * players,
+        "tie": [tie / done for tie in ties] if done else [0.0] * players,
+        "half_width": half_widths,
+        "categories": [{hand_type: amount / done if done else 0.0 for hand_type, amount in zip(HAND_TYPES, counts)}
+                       for counts in categories]
+    }
+
+
+if __name__ == "__main__":
+    result = simulate([[Card("A", "hearts"), Card("A", "spades")], [Card("K", "clubs"), Card("Q", "clubs")]],
+                      trials=200000, target_half_width=0.002)
+    print(result["trials"], result["equity"])
+    print(result["categories"][0])
@@ -1,4 +1,20 @@
 """Very awesome twitter script."""
+import heapq
+import os
+import re
+import time as clock
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NGRAM_SIZE = 3
+ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+UNESCAPES = {"t": "\t", "n": "\n", "r": "\r"}
 
 
 class Tweet:
@@ -27,6 +43,8 @@ def find_fastest_growing(tweets: list) -> Tweet:
     :param tweets: Input list of tweets.
     :return: Fastest growing tweet.
     """
+    if isinstance(tweets, TweetBatch):
+        return tweets.find_fastest_growing()
     return max(tweets, key=lambda tweet: tweet.retweets / tweet.time)
 
 
@@ -40,9 +58,107 @@ def sort_by_popularity(tweets: list) -> list:
     :param tweets: Input list of tweets.
     :return: List of tweets by popularity
     """
+    if isinstance(tweets, TweetBatch):
+        return tweets.sort_by_popularity()
     return sorted(tweets, key=lambda tweet: (tweet.retweets, -tweet.time), reverse=True)
 
 
+class TweetBatch:
+    """
+    Tweets with their times and retweets stored in typed arrays.
+
+    Growth rates and the popularity order are computed over whole columns, with NumPy when it is available.
+    """
+
+    def __init__(self, tweets: list = ()):
+        """
+        TweetBatch constructor.
+
+        :param tweets: Tweets to add.
+        """
+        self.tweets = []
+        self.times = array('d')
+        self.retweets = array('q')
+        self.extend(tweets)
+
+    def __len__(self):
+        """Return the amount of tweets."""
+        return len(self.tweets)
+
+    def extend(self, tweets: list):
+        """
+        Add tweets to the batch.
+
+        :param tweets: Tweets to add.
+        """
+        tweets = list(tweets)
+        self.tweets.extend(tweets)
+        self.times.extend(tweet.time for tweet in tweets)
+        self.retweets.extend(tweet.retweets for tweet in tweets)
+
+    def _columns(self) -> tuple:
+        return np.frombuffer(self.times, dtype=np.float64), np.frombuffer(self.retweets, dtype=np.int64)
+
+    def growth_rates(self):
+        """
+        Return the "retweets/time" of every tweet.
+
+        :return: NumPy array, or a list without NumPy.
+        """
+        if np is None:
+            return [retweets / time for retweets, time in zip(self.retweets, self.times)]
+        times, retweets = self._columns()
+        if not times.all():
+            raise ZeroDivisionError("float division by zero")
+        return retweets / times
+
+    def find_fastest_growing(self) -> Tweet:
+        """
+        Find the fastest growing tweet, the first one on a tie like find_fastest_growing.
+
+        :return: Fastest growing tweet.
+        """
+        if not self.tweets:
+            raise ValueError("Batch is empty")
+        rates = self.growth_rates()
+        if np is None:
+            return self.tweets[max(range(len(rates)), key=rates.__getitem__)]
+        return self.tweets[int(np.argmax(rates))]
+
+    def popularity_order(self, k: Optional[int] = None) -> list:
+        """
+        Return the indexes of the tweets by popularity.
+
+        More retweets first, then the newer tweet, then the order in the batch, like sort_by_popularity.
+        With k only the k most popular tweets are ordered, the rest are dropped without sorting.
+        :param k: Amount of indexes, all by default.
+        :return: List of indexes.
+        """
+        count = len(self.tweets) if k is None else min(k, len(self.tweets))
+        if count <= 0:
+            return []
+        if np is None:
+            times, retweets = self.times, self.retweets
+            if k is None:
+                return sorted(range(len(self.tweets)), key=lambda i: (-retweets[i], times[i]))
+            return heapq.nsmallest(count, range(len(self.tweets)), key=lambda i: (-retweets[i], times[i]))
+        times, retweets = self._columns()
+        if count == len(self.tweets):
+            return np.lexsort((times, -retweets)).tolist()
+        threshold = np.partition(retweets, len(retweets) - count)[len(retweets) - count]
+        candidates = np.flatnonzero(retweets >= threshold)
+        return candidates[np.lexsort((times[candidates], -retweets[candidates]))[:count]].tolist()
+
+    def sort_by_popularity(self, k: Optional[int] = None) -> list:
+        """
+        Sort tweets by popularity.
+
+        :param k: Amount of tweets, all by default.
+        :return: List of tweets by popularity.
+        """
+        return [self.tweets[i] for i in self.popularity_order(k)]
+
+
 def filter_by_hashtag(tweets: list, hashtag: str) -> list:
     """
     Filter tweets by hashtag.
@@ -61,6 +177,110 @@ def filter_by_hashtag(tweets: list, hashtag: str) -> list:
     return filtered_tweets
 
 
+def hashtags_of(content: str) -> list:
+    """
+    Tokenize the hashtags of a tweet.
+
+    A hashtag is a whitespace separated word starting with "#".
+    :param content: Content of the tweet.
+    :return: List of hashtags in the order they appear.
+    """
+    return [word for word in content.split() if word.startswith("#")]
+
+
+class TweetCorpus:
+    """
+    Tweets indexed by hashtag.
+
+    Every tweet is tokenized once when it is added and its index is appended to a posting list per
+    lower case hashtag, so filtering costs time proportional to the number of matches.
+    With substring=True the lower case contents are also indexed by n-grams, which keeps the
+    substring semantics of filter_by_hashtag.
+    """
+
+    def __init__(self, tweets: list = (), substring: bool = False, ngram_size: int = NGRAM_SIZE):
+        """
+        TweetCorpus constructor.
+
+        :param tweets: Tweets to add.
+        :param substring: Whether to index n-grams for substring filtering.
+        :param ngram_size: Length of the indexed n-grams.
+        """
+        self.tweets = []
+        self.substring = substring
+        self.ngram_size = ngram_size
+        self._postings = {}
+        self._ngrams = {}
+        self.extend(tweets)
+
+    def __len__(self):
+        """Return the amount of tweets."""
+        return len(self.tweets)
+
+    def add(self, tweet: Tweet):
+        """
+        Add a tweet to the corpus.
+
+        :param tweet: Tweet to add.
+        """
+        index = len(self.tweets)
+        self.tweets.append(tweet)
+        for hashtag in hashtags_of(tweet.content):
+            posting = self._postings.setdefault(hashtag.lower(), [])
+            if not posting or posting[-1] != index:
+                posting.append(index)
+        if self.substring:
+            content = tweet.content.lower()
+            size = self.ngram_size
+            for gram in {content[i:i + size] for i in range(len(content) - size + 1)}:
+                self._ngrams.setdefault(gram, []).append(index)
+
+    def extend(self, tweets: list):
+        """
+        Add tweets to the corpus.
+
+        :param tweets: Tweets to add.
+        """
+        for tweet in tweets:
+            self.add(tweet)
+
+    def hashtags(self) -> list:
+        """
+        Return the lower case hashtags of the corpus.
+
+        :return: List of hashtags in the order they were first seen.
+        """
+        return list(self._postings)
+
+    def filter_by_hashtag(self, hashtag: str) -> list:
+        """
+        Filter tweets by hashtag.
+
+        Return the tweets containing the given hashtag as a word, ignoring case.
+        In substring mode, return the tweets whose content contains the given text, like filter_by_hashtag.
+        :param hashtag: Hashtag to filter by.
+        :return: Filtered list of tweets in the order they were added.
+        """
+        if self.substring:
+            return [self.tweets[index] for index in self._substring_matches(hashtag.lower())]
+        return [self.tweets[index] for index in self._postings.get(hashtag.lower(), ())]
+
+    def _substring_matches(self, text: str) -> list:
+        size = self.ngram_size
+        if len(text) < size:
+            return [index for index, tweet in enumerate(self.tweets) if text in tweet.content.lower()]
+        grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+        postings = sorted((self._ngrams.get(gram, ()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        if len(grams) == 1 and len(text) == size:
+            return sorted(candidates)
+        return [index for index in sorted(candidates) if text in self.tweets[index].content.lower()]
+
+
 def sort_hashtags_by_popularity(tweets: list) -> list:
     """
     Sort hashtags by popularity.
@@ -87,6 +307,430 @@ def sort_hashtags_by_popularity(tweets: list) -> list:
     return sorted_hashtags
 
 
+class HashtagSketch:
+    """
+    Space-Saving summary of hashtag retweet sums in bounded memory.
+
+    At most capacity hashtags are monitored. When a new hashtag arrives and the summary is full,
+    the hashtag with the smallest count is replaced and the new one inherits that count as its error.
+    A monitored hashtag's true sum lies between count - error and count, and a hashtag that is not
+    monitored has a sum of at most max_error, which is never more than total / capacity.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        HashtagSketch constructor.
+
+        :param capacity: Maximum amount of monitored hashtags.
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def add(self, hashtag: str, retweets: int):
+        """
+        Add retweets to a hashtag.
+
+        :param hashtag: Hashtag to count.
+        :param retweets: Amount of retweets to add.
+        """
+        self.total += retweets
+        if hashtag in self.counts:
+            if not retweets:
+                return
+            count = self.counts[hashtag] + retweets
+        elif len(self.counts) < self.capacity:
+            count = retweets
+            self.errors[hashtag] = 0
+        else:
+            floor = self._min_count()
+            victim = heapq.heappop(self._heap)[1]
+            del self.counts[victim], self.errors[victim]
+            count = floor + retweets
+            self.errors[hashtag] = floor
+        self.counts[hashtag] = count
+        heapq.heappush(self._heap, (count, hashtag))
+        if len(self._heap) > 2 * len(self.counts) + 16:
+            self._heap = [(count, hashtag) for hashtag, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, tweets):
+        """
+        Add the hashtags of tweets.
+
+        :param tweets: Iterable of tweets.
+        """
+        for tweet in tweets:
+            for hashtag in hashtags_of(tweet.content):
+                self.add(hashtag, tweet.retweets)
+
+    def _min_count(self) -> int:
+        heap = self._heap
+        while heap and self.counts.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else 0
+
+    @property
+    def max_error(self) -> int:
+        """Return the largest possible sum of a hashtag that is not monitored."""
+        return self._min_count() if len(self.counts) >= self.capacity else 0
+
+    def bounds(self, hashtag: str) -> tuple:
+        """
+        Return the bounds of a hashtag's retweet sum.
+
+        :param hashtag: Hashtag to look up.
+        :return: Tuple of the lower and upper bound.
+        """
+        if hashtag in self.counts:
+            return self.counts[hashtag] - self.errors[hashtag], self.counts[hashtag]
+        return 0, self.max_error
+
+    def top(self, k: int) -> list:
+        """
+        Return the k most popular monitored hashtags.
+
+        Ties are sorted by alphabet like in sort_hashtags_by_popularity.
+        :param k: Amount of hashtags.
+        :return: List of (hashtag, count, error) tuples by popularity.
+        """
+        hashtags = heapq.nsmallest(k, self.counts, key=lambda x: (-self.counts[x], x))
+        return [(hashtag, self.counts[hashtag], self.errors[hashtag]) for hashtag in hashtags]
+
+
+def top_hashtags(tweets, k: int, capacity: Optional[int] = None) -> list:
+    """
+    Find the k most popular hashtags of a stream of tweets.
+
+    Without a capacity the sums are exact and the order is the same as in sort_hashtags_by_popularity.
+    With a capacity a HashtagSketch of that size is used, so memory stays bounded but the sums are
+    estimates: a hashtag's true sum lies between count - error and count.
+    :param tweets: Iterable of tweets.
+    :param k: Amount of hashtags.
+    :param capacity: Maximum amount of monitored hashtags, None for exact sums.
+    :return: List of (hashtag, count, error) tuples by popularity.
+    """
+    if capacity is not None:
+        sketch = HashtagSketch(max(capacity, k))
+        sketch.update(tweets)
+        return sketch.top(k)
+    hashtag_popularity = {}
+    for tweet in tweets:
+        for hashtag in hashtags_of(tweet.content):
+            hashtag_popularity[hashtag] = hashtag_popularity.get(hashtag, 0) + tweet.retweets
+    hashtags = heapq.nsmallest(k, hashtag_popularity, key=lambda x: (-hashtag_popularity[x], x))
+    return [(hashtag, hashtag_popularity[hashtag], 0) for hashtag in hashtags]
+
+
+class _RankedTotals:
+    """Hashtag totals that can go up and down, kept in a lazily cleaned heap for fast top N queries."""
+
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+        self._versions = {}
+        self._version = 0
+        self._heap = []
+
+    def add(self, hashtag: str, amount, count: int = 1):
+        """Add an amount to the hashtag's total, a negative count removes the hashtag when it reaches 0."""
+        remaining = self.counts.get(hashtag, 0) + count
+        if remaining <= 0:
+            self.totals.pop(hashtag, None)
+            self.counts.pop(hashtag, None)
+            self._versions.pop(hashtag, None)
+            return
+        self.counts[hashtag] = remaining
+        total = self.totals.get(hashtag, 0) + amount
+        if hashtag in self.totals and total == self.totals[hashtag]:
+            return
+        self.totals[hashtag] = total
+        self._version += 1
+        self._versions[hashtag] = self._version
+        heapq.heappush(self._heap, (-total, hashtag, self._version))
+        if len(self._heap) > 2 * len(self.totals) + 16:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(-self.totals[hashtag], hashtag, version) for hashtag, version in self._versions.items()]
+        heapq.heapify(self._heap)
+
+    def scale(self, factor: float, floor: float = 0.0):
+        """Multiply every total by a positive factor and drop the hashtags whose total falls below the floor."""
+        for hashtag, total in list(self.totals.items()):
+            total *= factor
+            if total < floor:
+                del self.totals[hashtag], self.counts[hashtag], self._versions[hashtag]
+            else:
+                self.totals[hashtag] = total
+        self._rebuild()
+
+    def top(self, n: int) -> list:
+        """Return the n largest (hashtag, total) pairs, walking only the top of the heap."""
+        heap, versions, result = self._heap, self._versions, []
+        while heap and versions.get(heap[0][1]) != heap[0][2]:
+            heapq.heappop(heap)
+        candidates = [(heap[0], 0)] if heap else []
+        while candidates and len(result) < n:
+            entry, index = heapq.heappop(candidates)
+            if versions.get(entry[1]) == entry[2]:
+                result.append((entry[1], -entry[0]))
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(candidates, (heap[child], child))
+        return result
+
+
+class TrendingHashtags:
+    """
+    Live hashtag rankings over a stream of timestamped tweets.
+
+    For every sliding window the retweets of the hashtags seen within the last window seconds are summed,
+    expired tweets are subtracted as time moves on. With a half life, hashtags are also ranked by
+    exponentially decayed retweets, where a retweet counts half as much every half_life seconds.
+    Once every half life the decayed totals are brought up to date and hashtags whose decayed retweets
+    have fallen below min_decayed are forgotten, so the decayed ranking only holds hashtags that are still alive.
+    Ties are sorted by alphabet like in sort_hashtags_by_popularity.
+    """
+
+    def __init__(self, windows: tuple = (300, 3600, 86400), half_life: Optional[float] = None,
+                 min_decayed: float = 0.5):
+        """
+        TrendingHashtags constructor.
+
+        :param windows: Lengths of the sliding windows in seconds.
+        :param half_life: Half life of the decayed ranking in seconds, None to not keep one.
+        :param min_decayed: Decayed retweets below which a hashtag is dropped from the decayed ranking.
+        """
+        self.windows = tuple(sorted(windows))
+        self.half_life = half_life
+        self.min_decayed = min_decayed
+        self.now = None
+        self._events = []
+        self._starts = [0] * len(self.windows)
+        self._windowed = [_RankedTotals() for _ in self.windows]
+        self._decayed = _RankedTotals() if half_life else None
+        self._landmark = None
+
+    def add(self, tweet: Tweet, timestamp: Optional[float] = None):
+        """
+        Add a tweet to the rankings.
+
+        The stream is expected in time order, a tweet older than the latest one counts as arriving now.
+        :param tweet: Tweet to add.
+        :param timestamp: Time the tweet arrived in seconds, the current time by default.
+        """
+        self.advance(clock.time() if timestamp is None else timestamp)
+        hashtags = hashtags_of(tweet.content)
+        if self.windows:
+            for hashtag in hashtags:
+                self._events.append((self.now, hashtag, tweet.retweets))
+                for totals in self._windowed:
+                    totals.add(hashtag, tweet.retweets)
+        if self._decayed is not None and hashtags:
+            if self._landmark is None:
+                self._landmark = self.now
+            exponent = (self.now - self._landmark) / self.half_life
+            if exponent >= 1:
+                self._decayed.scale(2 ** -exponent, self.min_decayed)
+                self._landmark, exponent = self.now, 0
+            for hashtag in hashtags:
+                self._decayed.add(hashtag, tweet.retweets * 2 ** exponent)
+
+    def advance(self, now: float):
+        """
+        Move the time forward and expire the tweets that fell out of the windows.
+
+        :param now: Current time in seconds.
+        """
+        if self.now is not None and now <= self.now:
+            return
+        self.now = now
+        events = self._events
+        for i, window in enumerate(self.windows):
+            start, totals = self._starts[i], self._windowed[i]
+            while start < len(events) and events[start][0] <= now - window:
+                _, hashtag, retweets = events[start]
+                totals.add(hashtag, -retweets, -1)
+                start += 1
+            self._starts[i] = start
+        if self._starts and self._starts[-1] > len(events) // 2:
+            shift = self._starts[-1]
+            del events[:shift]
+            self._starts = [start - shift for start in self._starts]
+
+    def top(self, n: int, window: float, now: Optional[float] = None) -> list:
+        """
+        Return the n most retweeted hashtags within a sliding window.
+
+        :param n: Amount of hashtags.
+        :param window: One of the window lengths given to the constructor.
+        :param now: Current time in seconds, the latest tweet's time by default.
+        :return: List of (hashtag, retweets) tuples by popularity.
+        """
+        if window not in self.windows:
+            raise ValueError(f"Unknown window {window}")
+        if now is not None:
+            self.advance(now)
+        return self._windowed[self.windows.index(window)].top(n)
+
+    def top_decayed(self, n: int, now: Optional[float] = None) -> list:
+        """
+        Return the n hashtags with the most decayed retweets.
+
+        :param n: Amount of hashtags.
+        :param now: Current time in seconds, the latest tweet's time by default.
+        :return: List of (hashtag, decayed retweets) tuples by popularity.
+        """
+        if self._decayed is None:
+            raise ValueError("No half life was given")
+        if now is not None:
+            self.advance(now)
+        if self._landmark is None:
+            return []
+        factor = 2 ** ((self._landmark - self.now) / self.half_life)
+        return [(hashtag, total * factor) for hashtag, total in self._decayed.top(n)]
+
+
+def format_tweet(tweet: Tweet) -> str:
+    """
+    Format a tweet as a line of a tweet file.
+
+    The fields are separated by tabs in the order user, time, retweets, content.
+    Backslashes, tabs and line breaks in the user and the content are escaped with a backslash.
+    :param tweet: Tweet to format.
+    :return: Line without the line break.
+    """
+    user = re.sub(r"[\\\t\n\r]", lambda match: ESCAPES[match[0]], tweet.user)
+    content = re.sub(r"[\\\t\n\r]", lambda match: ESCAPES[match[0]], tweet.content)
+    return f"{user}\t{tweet.time!r}\t{tweet.retweets}\t{content}"
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    return re.sub(r"\\(.)", lambda match: UNESCAPES.get(match[1], match[1]), text)
+
+
+def parse_tweet(line: str) -> Tweet:
+    """
+    Parse a line of a tweet file.
+
+    :param line: Line made by format_tweet.
+    :return: Tweet of the line.
+    """
+    user, time, retweets, content = line.rstrip("\r\n").split("\t", 3)
+    return Tweet(_unescape(user), _unescape(content), float(time), int(retweets))
+
+
+def write_tweets(filename: str, tweets):
+    """
+    Write tweets into a tweet file, one tweet per line.
+
+    :param filename: Name of the file.
+    :param tweets: Iterable of tweets.
+    """
+    with open(filename, "w", encoding="utf-8", newline="\n") as file:
+        for tweet in tweets:
+            file.write(format_tweet(tweet) + "\n")
+
+
+def read_tweets(filename: str, start: int = 0, end: Optional[int] = None):
+    """
+    Read the tweets of a tweet file.
+
+    :param filename: Name of the file.
+    :param start: Byte offset of the first line to read.
+    :param end: Byte offset after the last line to read, the end of the file by default.
+    :return: Generator of tweets.
+    """
+    with open(filename, "rb") as file:
+        file.seek(start)
+        position = start
+        for line in file:
+            if end is not None and position >= end:
+                break
+            position += len(line)
+            if line.strip():
+                yield parse_tweet(line.decode("utf-8"))
+
+
+def _line_ranges(filename: str, shards: int) -> list:
+    """
+    Split the file into byte ranges that start and end on line boundaries.
+
+    :param filename: Name of the file.
+    :param shards: Amount of ranges wanted.
+    :return: List of (start, end) byte ranges covering the whole file, in file order.
+    """
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, "rb") as file:
+        for shard in range(1, shards):
+            position = size * shard // shards
+            if position <= bounds[-1]:
+                continue
+            file.seek(position - 1)
+            file.readline()
+            position = file.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+
+def _count_hashtags(shard: tuple) -> dict:
+    """
+    Sum the retweets of every hashtag in a byte range of a tweet file.
+
+    :param shard: Tuple of the file name and the byte range.
+    :return: Dict of hashtag to retweets.
+    """
+    filename, start, end = shard
+    hashtag_popularity = {}
+    for tweet in read_tweets(filename, start, end):
+        for hashtag in hashtags_of(tweet.content):
+            hashtag_popularity[hashtag] = hashtag_popularity.get(hashtag, 0) + tweet.retweets
+    return hashtag_popularity
+
+
+def sort_hashtags_by_popularity_parallel(filenames, workers: Optional[int] = None, split: bool = True) -> list:
+    """
+    Sort the hashtags of tweet files by popularity using several processes.
+
+    Every shard is counted in a process pool, the partial counts are then added up and sorted
+    like in sort_hashtags_by_popularity, so the result is the same as for all the tweets in one list.
+    :param filenames: Name of a tweet file or a list of them.
+    :param workers: Amount of processes, the amount of CPUs by default.
+    :param split: Whether to split files into line-aligned byte ranges, otherwise every file is one shard.
+    :return: List of hashtags by popularity.
+    """
+    if isinstance(filenames, str):
+        filenames = [filenames]
+    workers = workers or os.cpu_count() or 1
+    paths = [os.path.abspath(filename) for filename in filenames]
+    if split:
+        total = sum(os.path.getsize(path) for path in paths) or 1
+        shards = [(path, start, end) for path in paths
+                  for start, end in _line_ranges(path, max(1, workers * 4 * os.path.getsize(path) // total))]
+    else:
+        shards = [(path, 0, None) for path in paths]
+    if workers == 1 or len(shards) <= 1:
+        counts = map(_count_hashtags, shards)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = list(executor.map(_count_hashtags, shards))
+    hashtag_popularity = {}
+    for partial in counts:
+        for hashtag, retweets in partial.items():
+            hashtag_popularity[hashtag] = hashtag_popularity.get(hashtag, 0) + retweets
+    return sorted(hashtag_popularity.keys(), key=lambda x: (-hashtag_popularity[x], x))
+
+
 if __name__ == '__main__':
     tweet1 = Tweet("@realDonaldTrump", "Despite the negative press covfefe #bigsmart", 1249, 54303)
     tweet2 = Tweet("@elonmusk", "Technically, alcohol is a solution #bigsmart", 366.4, 166500)